@@ -1,9 +1,15 @@
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from transformers import AutoTokenizer
 import torch
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 from pydantic import BaseModel
+from src.storage.result_cache import ResultCache
+from src.models.inference_backends import load_sequence_classifier
+from src.monitoring.metrics import observe_tokens
+
+# Najmanjši delež povedi (po žetonih) s pozitivno in z negativno oznako za mešan članek
+MIXED_SHARE = 0.25
 
 class SentimentResult(BaseModel):
     text: str
@@ -11,15 +17,50 @@ class SentimentResult(BaseModel):
     confidence: float
     scores: Dict[str, float]
 
+class SentenceSentiment(BaseModel):
+    text: str
+    sentiment: str
+    confidence: float
+
+class ArticleSentimentResult(SentimentResult):
+    """Sentiment članka, združen iz ocen posameznih povedi."""
+    intensity: str
+    mixed: bool
+    sentence_counts: Dict[str, int]
+    sentences: List[SentenceSentiment] = []
+
 class FinancialSentimentAnalyzer:
-    def __init__(self, model_name: str = "ProsusAI/finbert"):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    def __init__(self, model_name: str = "ProsusAI/finbert", cache: Optional[ResultCache] = None,
+                 device: Optional[str] = None, dtype: Optional[str] = None,
+                 backend: str = 'eager', onnx_cache_dir: str = "data/onnx",
+                 intensity_thresholds: Optional[Dict[str, float]] = None,
+                 sentence_batch_size: int = 64):
+        self.model_name = model_name
+        self.cache = cache
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device)
+        self.backend = backend
+        self.model = load_sequence_classifier(
+            model_name,
+            backend=backend,
+            device=self.device,
+            dtype=dtype,
+            onnx_cache_dir=onnx_cache_dir
+        )
         self.logger = logging.getLogger(__name__)
         self.labels = ["positive", "negative", "neutral"]
+        self.max_length = 512
+        # Nad pragom je članek "strongly", pod njim "mildly" pozitiven ali negativen
+        self.intensity_thresholds = intensity_thresholds or {'positive': 0.6, 'negative': 0.6}
+        self.sentence_batch_size = sentence_batch_size
     
     def analyze_sentiment(self, text: str) -> SentimentResult:
+        cache_key = self._cache_key(text)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return SentimentResult(**cached)
+        
         try:
             # Tokenizacija
             inputs = self.tokenizer(
@@ -27,7 +68,7 @@ class FinancialSentimentAnalyzer:
                 return_tensors="pt",
                 padding=True,
                 truncation=True,
-                max_length=512
+                max_length=self.max_length
             ).to(self.device)
             
             # Napoved
@@ -35,30 +76,220 @@ class FinancialSentimentAnalyzer:
                 outputs = self.model(**inputs)
                 scores = torch.nn.functional.softmax(outputs.logits, dim=1)
                 scores = scores[0].cpu().numpy()
+            observe_tokens('score', int(inputs['input_ids'].shape[1]))
             
-            # Določitev sentimenta
-            sentiment_idx = np.argmax(scores)
-            sentiment = self.labels[sentiment_idx]
-            confidence = float(scores[sentiment_idx])
-            
-            # Pripravi rezultat
-            result = SentimentResult(
-                text=text,
-                sentiment=sentiment,
-                confidence=confidence,
-                scores={label: float(score) for label, score in zip(self.labels, scores)}
-            )
-            
+            result = self._build_result(text, scores)
+            if cache_key:
+                self.cache.put(cache_key, result.dict())
             return result
-            
+        
         except Exception as e:
             self.logger.error(f"Napaka pri analizi sentimenta: {str(e)}")
             return None
     
-    def analyze_batch(self, texts: List[str], batch_size: int = 16) -> List[SentimentResult]:
-        results = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_results = [self.analyze_sentiment(text) for text in batch]
-            results.extend([r for r in batch_results if r is not None])
-        return results 
\ No newline at end of file
+    def analyze_batch(self, texts: List[str], batch_size: int = 16,
+                      sentence_splitter: Optional[Callable[[str], List[str]]] = None,
+                      sentences: Optional[List[List[str]]] = None) -> List[Optional[SentimentResult]]:
+        """Paketna analiza sentimenta z enim prehodom modela na paket.
+        
+        Rezultati so v vrstnem redu vhoda; na mestu neuspelega besedila je None.
+        Z `sentence_splitter` se ocenijo posamezne povedi (ArticleSentimentResult);
+        neprazni seznami v `sentences` so že znane povedi besedila in se ne delijo znova.
+        """
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        sentence_level = sentence_splitter is not None
+        if not sentence_level or sentences is None:
+            sentences = [[] for _ in texts]
+        cache_keys: Dict[int, str] = {}
+        pending = list(range(len(texts)))
+        if self.cache:
+            # Modelu pošljemo le besedila, ki jih ni v predpomnilniku
+            pending = []
+            result_type = ArticleSentimentResult if sentence_level else SentimentResult
+            for idx, text in enumerate(texts):
+                # Z znanimi mejami povedi je ključ odvisen tudi od njih
+                key = self._cache_key('\n'.join(sentences[idx]) or text, sentence_level)
+                cached = self.cache.get(key)
+                if cached is None:
+                    cache_keys[idx] = key
+                    pending.append(idx)
+                else:
+                    results[idx] = result_type(**cached)
+        
+        if sentence_level:
+            self._analyze_sentences(texts, sentences, pending, sentence_splitter, results, cache_keys)
+            return results
+        
+        encoded = self._encode_items(texts, pending)
+        
+        # Razvrsti po dolžini, da se kratka besedila ne dopolnjujejo do najdaljšega
+        order = sorted(encoded, key=lambda idx: len(encoded[idx]))
+        
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            try:
+                scores = self._predict_batch([encoded[idx] for idx in indices])
+            except Exception as e:
+                # Ponovi posamično, da napako pripišemo le problematičnim besedilom
+                self.logger.error(f"Napaka pri paketni analizi sentimenta: {str(e)}")
+                for idx in indices:
+                    results[idx] = self.analyze_sentiment(texts[idx])
+                continue
+            
+            for idx, row in zip(indices, scores):
+                results[idx] = self._build_result(texts[idx], row)
+                if idx in cache_keys:
+                    self.cache.put(cache_keys[idx], results[idx].dict())
+        
+        return results
+    
+    def _analyze_sentences(self, texts: List[str], known_sentences: List[List[str]], pending: List[int],
+                           sentence_splitter: Callable[[str], List[str]],
+                           results: List[Optional[SentimentResult]], cache_keys: Dict[int, str]):
+        # Povedi vseh besedil gredo v skupne pakete; spans hrani obseg povedi vsakega besedila
+        sentences: List[str] = []
+        spans: Dict[int, Tuple[int, int]] = {}
+        for idx in pending:
+            text = texts[idx]
+            if not isinstance(text, str) or not text.strip():
+                self.logger.error(f"Napaka pri analizi sentimenta: prazno besedilo na mestu {idx}")
+                continue
+            try:
+                parts = [
+                    sentence for sentence in known_sentences[idx] or sentence_splitter(text)
+                    if sentence.strip()
+                ]
+            except Exception as e:
+                self.logger.error(f"Napaka pri delitvi besedila na povedi: {str(e)}")
+                parts = []
+            spans[idx] = (len(sentences), len(sentences) + len(parts or [text]))
+            sentences.extend(parts or [text])
+        
+        encoded = self._encode_items(sentences)
+        order = sorted(encoded, key=lambda position: len(encoded[position]))
+        scores = np.full((len(sentences), len(self.labels)), np.nan, dtype=np.float32)
+        weights = np.zeros(len(sentences), dtype=np.float32)
+        for position, input_ids in encoded.items():
+            weights[position] = len(input_ids)
+        
+        for start in range(0, len(order), self.sentence_batch_size):
+            positions = order[start:start + self.sentence_batch_size]
+            try:
+                scores[positions] = self._predict_batch([encoded[position] for position in positions])
+            except Exception as e:
+                # Brez ponovitve po povedih; članek se oceni iz preostalih povedi
+                self.logger.error(f"Napaka pri paketni analizi povedi: {str(e)}")
+        
+        for idx, (start, end) in spans.items():
+            valid = ~np.isnan(scores[start:end, 0])
+            if not valid.any():
+                self.logger.error(f"Napaka pri analizi sentimenta: nobena poved besedila {idx} ni ocenjena")
+                continue
+            results[idx] = self._build_article_result(
+                texts[idx],
+                [sentence for sentence, ok in zip(sentences[start:end], valid) if ok],
+                scores[start:end][valid],
+                weights[start:end][valid]
+            )
+            if idx in cache_keys:
+                self.cache.put(cache_keys[idx], results[idx].dict())
+    
+    def _build_article_result(self, text: str, sentences: List[str], scores: np.ndarray,
+                              weights: np.ndarray) -> ArticleSentimentResult:
+        # Porazdelitev članka je povprečje povedi, uteženo s številom žetonov
+        article = self._build_result(text, np.average(scores, axis=0, weights=weights))
+        sentence_labels = scores.argmax(axis=1)
+        shares = {
+            label: float(weights[sentence_labels == idx].sum() / weights.sum())
+            for idx, label in enumerate(self.labels)
+        }
+        return ArticleSentimentResult(
+            **article.dict(),
+            intensity=self._intensity(article.sentiment, article.confidence),
+            mixed=shares['positive'] >= MIXED_SHARE and shares['negative'] >= MIXED_SHARE,
+            sentence_counts={
+                label: int((sentence_labels == idx).sum()) for idx, label in enumerate(self.labels)
+            },
+            sentences=[
+                SentenceSentiment(
+                    text=sentence,
+                    sentiment=self.labels[label_idx],
+                    confidence=float(row[label_idx])
+                )
+                for sentence, row, label_idx in zip(sentences, scores, sentence_labels)
+            ]
+        )
+    
+    def _intensity(self, sentiment: str, confidence: float) -> str:
+        if sentiment not in self.intensity_thresholds:
+            return sentiment
+        degree = "strongly" if confidence >= self.intensity_thresholds[sentiment] else "mildly"
+        return f"{degree} {sentiment}"
+    
+    def _cache_key(self, text: str, sentence_level: bool = False) -> Optional[str]:
+        if not self.cache:
+            return None
+        params = {'max_length': self.max_length, 'backend': self.backend}
+        if sentence_level:
+            params['sentence_level'] = True
+            params['intensity_thresholds'] = self.intensity_thresholds
+        return self.cache.make_key(text, self.model_name, params)
+    
+    def _encode_items(self, texts: List[str], indices: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Tokenizira besedila brez dopolnjevanja; neuspela besedila izpusti in zabeleži."""
+        if indices is None:
+            indices = range(len(texts))
+        valid = {idx: texts[idx] for idx in indices if isinstance(texts[idx], str) and texts[idx].strip()}
+        for idx in indices:
+            if idx not in valid:
+                self.logger.error(f"Napaka pri analizi sentimenta: prazno besedilo na mestu {idx}")
+        
+        try:
+            encodings = self.tokenizer(
+                list(valid.values()),
+                truncation=True,
+                max_length=self.max_length
+            )
+            return dict(zip(valid.keys(), encodings['input_ids']))
+        except Exception:
+            encoded = {}
+            for idx, text in valid.items():
+                try:
+                    encoded[idx] = self.tokenizer(
+                        text,
+                        truncation=True,
+                        max_length=self.max_length
+                    )['input_ids']
+                except Exception as e:
+                    self.logger.error(f"Napaka pri tokenizaciji besedila na mestu {idx}: {str(e)}")
+            return encoded
+    
+    def _predict_batch(self, input_ids: List[List[int]]) -> np.ndarray:
+        # Dinamično dopolnjevanje do najdaljšega zaporedja v paketu
+        inputs = self.tokenizer.pad(
+            {'input_ids': input_ids},
+            padding=True,
+            return_tensors="pt"
+        ).to(self.device)
+        if 'token_type_ids' in self.tokenizer.model_input_names:
+            inputs['token_type_ids'] = torch.zeros_like(inputs['input_ids'])
+        
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            scores = torch.nn.functional.softmax(outputs.logits, dim=1)
+        observe_tokens('score', int(inputs['attention_mask'].sum()))
+        return scores.cpu().numpy()
+    
+    def _build_result(self, text: str, scores: np.ndarray) -> SentimentResult:
+        # Določitev sentimenta
+        sentiment_idx = np.argmax(scores)
+        sentiment = self.labels[sentiment_idx]
+        confidence = float(scores[sentiment_idx])
+        
+        # Pripravi rezultat
+        return SentimentResult(
+            text=text,
+            sentiment=sentiment,
+            confidence=confidence,
+            scores={label: float(score) for label, score in zip(self.labels, scores)}
+        )
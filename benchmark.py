@@ -0,0 +1,623 @@
+import argparse
+import copy
+import gc
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import psutil
+import torch
+import yaml
+from bs4 import BeautifulSoup
+from src.data_collection.html_extractor import HtmlExtractor
+from src.data_collection.news_scraper import FinancialNewsScraper
+from src.preprocessing.text_cleaner import TextCleaner
+from src.summarization.summarizer import DECODING_PROFILES, NewsSummarizer
+from src.sentiment.analyzer import FinancialSentimentAnalyzer
+from src.evaluation.evaluator import FinancialNewsEvaluator
+from src.models.inference_backends import BACKENDS, model_size_mb
+from src.pipeline.worker_pool import InferenceWorkerPool
+
+# Strežniki, s katerih so shranjene testne strani
+FIXTURE_HOSTS = {
+    'reuters_markets.html': 'www.reuters.com',
+    'ft_article.html': 'www.ft.com',
+    'generic_news.html': 'news.example.com'
+}
+
+VOCABULARY = (
+    "market shares investors earnings revenue guidance quarter profit analysts bank rates "
+    "inflation bond yields stocks index growth outlook dividend merger acquisition forecast "
+    "oil dollar euro central policy trading volume sector technology energy retail demand "
+    "supply costs margin the a of and to in for on with by"
+).split()
+
+def setup_logging():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+def load_html_fixtures(fixtures_dir: str) -> List[Tuple[str, str, str]]:
+    """Vrne (ime, strežnik, html) za vse shranjene HTML strani."""
+    fixtures = []
+    for path in sorted(Path(fixtures_dir).glob('*.html')):
+        host = FIXTURE_HOSTS.get(path.name, 'localhost')
+        fixtures.append((path.name, host, path.read_text(encoding='utf-8')))
+    return fixtures
+
+def legacy_extract(html: str, host: str) -> Tuple[str, str]:
+    """Izločanje, kot ga je izvajal prvotni scrape_url (celotno drevo, html.parser)."""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    article_content = ""
+    for selector in ['article', '.article-content', '.article-body', '#article-body', '.story-content']:
+        content = soup.select_one(selector)
+        if content:
+            for tag in content.find_all(['script', 'style']):
+                tag.decompose()
+            article_content = content.get_text(strip=True)
+            break
+    
+    if not article_content:
+        paragraphs = soup.find_all('p')
+        article_content = ' '.join(p.get_text(strip=True) for p in paragraphs)
+    
+    title = ""
+    for selector in ['h1', '.article-title', '.headline']:
+        title_elem = soup.select_one(selector)
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+            break
+    
+    if not title:
+        title = soup.title.string if soup.title else "Neznan naslov"
+    
+    return title, article_content
+
+def benchmark_extraction(fixtures_dir: str = "fixtures/html", repeat: int = 20) -> Dict:
+    """Primerja strani/s prvotnega izločanja v scrape_url in hitre poti HtmlExtractor."""
+    fixtures = load_html_fixtures(fixtures_dir)
+    fast_path = HtmlExtractor()
+    engines = {
+        'baseline': ('html.parser', legacy_extract),
+        'fast_path': (fast_path.parser, fast_path.extract)
+    }
+    
+    results = {}
+    outputs = {}
+    for name, (parser, extract) in engines.items():
+        outputs[name] = [extract(html, host) for _, host, html in fixtures]
+        
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, host, html in fixtures:
+                extract(html, host)
+        elapsed = time.perf_counter() - start
+        
+        results[name] = {
+            'parser': parser,
+            'pages': repeat * len(fixtures),
+            'seconds': elapsed,
+            'pages_per_sec': repeat * len(fixtures) / elapsed
+        }
+    
+    results['speedup'] = results['fast_path']['pages_per_sec'] / results['baseline']['pages_per_sec']
+    # Hitra pot (omejeno drevo) mora dati enak rezultat kot celotno drevo z istimi profili
+    # in kot shranjeni pričakovani izhod strani
+    reference = HtmlExtractor(parser='html.parser', restricted=False)
+    expected_path = Path(fixtures_dir) / 'expected.json'
+    expected = json.loads(expected_path.read_text(encoding='utf-8')) if expected_path.exists() else {}
+    results['matching_pages'] = sum(
+        reference.extract(html, host) == fast
+        and (name not in expected or [expected[name]['title'], expected[name]['content']] == list(fast))
+        for (name, host, html), fast in zip(fixtures, outputs['fast_path'])
+    )
+    results['total_pages'] = len(fixtures)
+    return results
+
+def synthetic_articles(count: int, seed: int = 0, pool_size: int = 1000) -> Iterator[str]:
+    """Sintetični članki z HTML oznakami, ločili in odvečnimi presledki."""
+    rng = random.Random(seed)
+    
+    def sentence() -> str:
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 24))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), f"{rng.randint(1, 99)}.{rng.randint(0, 9)}%")
+        return ' '.join(words).capitalize() + rng.choice(['.', '!', '?', '...'])
+    
+    paragraphs = [
+        f"<p>{' '.join(sentence() for _ in range(rng.randint(2, 5)))}</p>\n  "
+        for _ in range(pool_size)
+    ]
+    for _ in range(count):
+        yield f"<div class=\"story\">{''.join(rng.choice(paragraphs) for _ in range(rng.randint(3, 8)))}</div>"
+
+def legacy_clean_text(text: str) -> str:
+    """Prejšnja izvedba TextCleaner.clean_text (trije prehodi), za primerjavo."""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = ' '.join(text.split())
+    return text.lower()
+
+def benchmark_cleaner(num_articles: int = 100000) -> Dict:
+    """Prepustnost čiščenja besedila na sintetičnem korpusu."""
+    corpus = list(synthetic_articles(num_articles))
+    cleaner = TextCleaner()
+    corpus_mb = sum(len(text) for text in corpus) / 1e6
+    
+    runs = {
+        'legacy': lambda: [legacy_clean_text(text) for text in corpus],
+        'clean_text': lambda: [cleaner.clean_text(text) for text in corpus],
+        'clean_batch': lambda: list(cleaner.clean_batch(corpus))
+    }
+    
+    results = {'articles': num_articles, 'corpus_mb': corpus_mb}
+    outputs = {}
+    for name, run in runs.items():
+        start = time.perf_counter()
+        outputs[name] = run()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': elapsed,
+            'articles_per_sec': num_articles / elapsed,
+            'mb_per_sec': corpus_mb / elapsed
+        }
+    
+    results['speedup'] = results['clean_batch']['articles_per_sec'] / results['legacy']['articles_per_sec']
+    results['identical_output'] = outputs['legacy'] == outputs['clean_batch']
+    return results
+
+def benchmark_backends(summarizer_model: str = "t5-base", sentiment_model: str = "ProsusAI/finbert",
+                       backends: Tuple[str, ...] = BACKENDS, num_articles: int = 32,
+                       onnx_cache_dir: str = "data/onnx", max_length: int = 60,
+                       min_length: int = 10) -> Dict:
+    """Zakasnitev, pomnilnik in ujemanje izvajalnih okolij s fp32 potjo (eager)."""
+    backends = ['eager'] + [backend for backend in backends if backend != 'eager']
+    cleaner = TextCleaner()
+    evaluator = FinancialNewsEvaluator()
+    texts = [cleaner.clean_text(text) for text in synthetic_articles(num_articles, seed=1)]
+    process = psutil.Process()
+    
+    results = {}
+    reference = None
+    for backend in backends:
+        rss_before = process.memory_info().rss
+        summarizer = NewsSummarizer(summarizer_model, device='cpu', backend=backend,
+                                    onnx_cache_dir=onnx_cache_dir)
+        analyzer = FinancialSentimentAnalyzer(sentiment_model, device='cpu', backend=backend,
+                                              onnx_cache_dir=onnx_cache_dir)
+        rss_after_load = process.memory_info().rss
+        
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        summaries = summarizer.summarize_batch(texts, max_length=max_length, min_length=min_length)
+        summarize_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        sentiments = analyzer.analyze_batch(texts)
+        sentiment_seconds = time.perf_counter() - start
+        
+        labels = [result.sentiment if result else None for result in sentiments]
+        rouge = evaluator.evaluate_summaries(texts, summaries)['average_scores']
+        entry = {
+            'summarize_ms_per_article': 1000 * summarize_seconds / len(texts),
+            'sentiment_ms_per_article': 1000 * sentiment_seconds / len(texts),
+            'rss_delta_mb': (rss_after_load - rss_before) / 1024 ** 2,
+            'summarizer_size_mb': model_size_mb(summarizer.model),
+            'sentiment_size_mb': model_size_mb(analyzer.model),
+            'rouge': rouge
+        }
+        
+        if reference is None:
+            reference = {'summaries': summaries, 'labels': labels, 'rouge': rouge}
+        else:
+            entry['label_agreement'] = float(np.mean([
+                label == ref_label for label, ref_label in zip(labels, reference['labels'])
+            ]))
+            entry['rouge_delta'] = {
+                metric: score - reference['rouge'][metric] for metric, score in rouge.items()
+            }
+            entry['rougeL_vs_eager'] = evaluator.evaluate_summaries(
+                reference['summaries'], summaries
+            )['average_scores']['rougeL']
+        
+        results[backend] = entry
+        del summarizer, analyzer
+        gc.collect()
+    
+    return results
+
+def benchmark_profiles(summarizer_model: str = "t5-base", profiles: Tuple[str, ...] = tuple(DECODING_PROFILES),
+                       num_articles: int = 8, time_budget: float = 0.5, seed: int = 0,
+                       max_length: int = 150, min_length: int = 40) -> Dict:
+    """Izmerjena in pričakovana latenca profilov dekodiranja ter ponovljivost povzetkov."""
+    cleaner = TextCleaner()
+    texts = [cleaner.clean_text(text) for text in synthetic_articles(num_articles, seed=2)]
+    summarizer = NewsSummarizer(summarizer_model, device='cpu', seed=seed)
+    
+    results = {}
+    for profile in profiles:
+        runs = []
+        latencies = []
+        for _ in range(2):
+            summaries = []
+            for text in texts:
+                start = time.perf_counter()
+                summaries.append(summarizer.summarize(text, max_length, min_length, profile=profile))
+                latencies.append(time.perf_counter() - start)
+            runs.append(summaries)
+        
+        budgeted = []
+        for text in texts:
+            start = time.perf_counter()
+            summarizer.summarize(text, max_length, min_length, profile=profile, time_budget=time_budget)
+            budgeted.append(time.perf_counter() - start)
+        
+        results[profile] = {
+            'expected_latency_s': DECODING_PROFILES[profile].expected_latency_s,
+            'p50_latency_s': float(np.percentile(latencies, 50)),
+            'max_latency_s': float(np.max(latencies)),
+            'deterministic': runs[0] == runs[1],
+            'budget_s': time_budget,
+            'max_budgeted_latency_s': float(np.max(budgeted))
+        }
+    
+    return results
+
+def benchmark_workers(config_path: str = "config/config.yaml", worker_counts: Tuple[int, ...] = (1, 2, 4),
+                      threads_per_worker: Optional[int] = None, num_articles: int = 64,
+                      summarizer_model: Optional[str] = None, sentiment_model: Optional[str] = None) -> Dict:
+    """Prepustnost povzemanja in sentimenta (članki/s) glede na število procesov bazena."""
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    config = copy.deepcopy(config)
+    config['storage']['cache']['enabled'] = False
+    # Merimo le model, zato usmerjevalnik vse članke pošlje v T5
+    config['summarization']['routing']['enabled'] = False
+    if summarizer_model:
+        config['summarization']['model_name'] = summarizer_model
+    if sentiment_model:
+        config['sentiment_analysis']['model_name'] = sentiment_model
+    
+    cleaner = TextCleaner()
+    texts = [cleaner.clean_text(text) for text in synthetic_articles(num_articles, seed=3)]
+    summary_batch_size = config['summarization']['batch_size']
+    sentiment_batch_size = config['sentiment_analysis']['batch_size']
+    summary_batches = [
+        (texts[start:start + summary_batch_size], [[text] for text in texts[start:start + summary_batch_size]])
+        for start in range(0, len(texts), summary_batch_size)
+    ]
+    sentiment_batches = [
+        (texts[start:start + sentiment_batch_size], [[] for _ in texts[start:start + sentiment_batch_size]])
+        for start in range(0, len(texts), sentiment_batch_size)
+    ]
+    
+    results = {'articles': num_articles, 'cpu_count': os.cpu_count(), 'workers': {}}
+    for num_workers in worker_counts:
+        with InferenceWorkerPool(config, num_workers, threads_per_worker) as pool:
+            pool.warmup()
+            
+            start = time.perf_counter()
+            summaries = [summary for batch in pool.summarize_batches(summary_batches) for summary in batch]
+            summarize_seconds = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            sentiments = [result for batch in pool.score_batches(sentiment_batches) for result in batch]
+            sentiment_seconds = time.perf_counter() - start
+            
+            results['workers'][num_workers] = {
+                'threads_per_worker': pool.threads_per_worker,
+                'summarize_articles_per_sec': len(summaries) / summarize_seconds,
+                'sentiment_articles_per_sec': len(sentiments) / sentiment_seconds
+            }
+    
+    # Pospešek glede na najmanjši bazen
+    reference = results['workers'][worker_counts[0]]
+    for entry in results['workers'].values():
+        entry['summarize_speedup'] = entry['summarize_articles_per_sec'] / reference['summarize_articles_per_sec']
+        entry['sentiment_speedup'] = entry['sentiment_articles_per_sec'] / reference['sentiment_articles_per_sec']
+    
+    return results
+
+class PeakRssSampler:
+    """Vzorči RSS procesa v ozadju in si zapomni največjo vrednost."""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def __enter__(self) -> 'PeakRssSampler':
+        self.peak = self.process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+def measure_stage(run: Callable, items: List, warmup: int = 2) -> Dict:
+    """Zakasnitev posameznih klicev, prepustnost in največji RSS za eno stopnjo."""
+    for item in items[:warmup]:
+        run(item)
+    
+    latencies = np.empty(len(items))
+    with PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        for idx, item in enumerate(items):
+            item_start = time.perf_counter()
+            run(item)
+            latencies[idx] = time.perf_counter() - item_start
+        elapsed = time.perf_counter() - start
+    
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+    return {
+        'items': len(items),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'items_per_sec': len(items) / elapsed,
+        'peak_rss_mb': sampler.peak / 1024 ** 2
+    }
+
+def build_tiny_models(output_dir: str, seed: int = 0) -> Tuple[str, str]:
+    """Ustvari majhna naključno inicializirana T5 in BERT modela brez omrežja."""
+    import sentencepiece as spm
+    from transformers import (
+        BertConfig, BertForSequenceClassification, BertTokenizer,
+        T5Config, T5ForConditionalGeneration, T5Tokenizer
+    )
+    
+    output = Path(output_dir)
+    t5_dir = output / 't5'
+    bert_dir = output / 'bert'
+    if (t5_dir / 'config.json').exists() and (bert_dir / 'config.json').exists():
+        return str(t5_dir), str(bert_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    torch.manual_seed(seed)
+    cleaner = TextCleaner()
+    corpus = [cleaner.clean_text(text) for text in synthetic_articles(200, seed=seed)]
+    
+    # T5: tokenizator sentencepiece, naučen na sintetičnem korpusu
+    corpus_path = output / 'corpus.txt'
+    corpus_path.write_text('\n'.join(corpus), encoding='utf-8')
+    spm.SentencePieceTrainer.train(
+        input=str(corpus_path),
+        model_prefix=str(output / 'spiece'),
+        vocab_size=200,
+        pad_id=0,
+        eos_id=1,
+        unk_id=2,
+        bos_id=-1,
+        minloglevel=2
+    )
+    t5_dir.mkdir(exist_ok=True)
+    t5_tokenizer = T5Tokenizer(str(output / 'spiece.model'))
+    t5_tokenizer.save_pretrained(str(t5_dir))
+    T5ForConditionalGeneration(T5Config(
+        vocab_size=len(t5_tokenizer),
+        d_model=32,
+        d_kv=16,
+        d_ff=64,
+        num_layers=2,
+        num_heads=2,
+        decoder_start_token_id=0
+    )).save_pretrained(str(t5_dir))
+    
+    # BERT: besednjak iz besed korpusa
+    bert_dir.mkdir(exist_ok=True)
+    words = sorted({word for text in corpus for word in text.split()})
+    vocab_path = bert_dir / 'vocab.txt'
+    vocab_path.write_text(
+        '\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words),
+        encoding='utf-8'
+    )
+    BertTokenizer(str(vocab_path)).save_pretrained(str(bert_dir))
+    labels = ['positive', 'negative', 'neutral']
+    BertForSequenceClassification(BertConfig(
+        vocab_size=len(words) + 5,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=len(labels),
+        id2label=dict(enumerate(labels)),
+        label2id={label: idx for idx, label in enumerate(labels)}
+    )).save_pretrained(str(bert_dir))
+    
+    return str(t5_dir), str(bert_dir)
+
+class QuietFixtureHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_fixtures(fixtures_dir: str) -> Tuple[ThreadingHTTPServer, str]:
+    """Lokalni HTTP strežnik za shranjene HTML strani."""
+    handler = partial(QuietFixtureHandler, directory=fixtures_dir)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def benchmark_suite(num_articles: int = 200, fixtures_dir: str = "fixtures/html",
+                    models_dir: Optional[str] = None, scrape_repeat: int = 10) -> Dict:
+    """Zakasnitev, prepustnost in pomnilnik vseh stopenj cevovoda brez omrežja."""
+    t5_dir, bert_dir = build_tiny_models(models_dir or tempfile.mkdtemp(prefix='tiny_models_'))
+    articles = list(synthetic_articles(num_articles, seed=5))
+    cleaner = TextCleaner()
+    cleaned = [cleaner.clean_text(text) for text in articles]
+    torch.set_num_threads(1)
+    
+    results = {'articles': num_articles, 'stages': {}}
+    stages = results['stages']
+    stages['clean_text'] = measure_stage(cleaner.clean_text, articles)
+    
+    scraper = FinancialNewsScraper(timeout=5.0)
+    server, base_url = serve_fixtures(fixtures_dir)
+    try:
+        urls = [f"{base_url}/{path.name}" for path in sorted(Path(fixtures_dir).glob('*.html'))]
+        stages['scrape_url'] = measure_stage(scraper.scrape_url, urls * scrape_repeat)
+    finally:
+        server.shutdown()
+    
+    summarizer = NewsSummarizer(t5_dir, device='cpu', seed=0)
+    summary_inputs = cleaned[:max(num_articles // 4, 1)]
+    stages['summarize'] = measure_stage(
+        lambda text: summarizer.summarize(text, max_length=32, min_length=8),
+        summary_inputs
+    )
+    summaries = summarizer.summarize_batch(summary_inputs, max_length=32, min_length=8)
+    
+    analyzer = FinancialSentimentAnalyzer(bert_dir, device='cpu')
+    stages['analyze_sentiment'] = measure_stage(analyzer.analyze_sentiment, cleaned)
+    
+    evaluator = FinancialNewsEvaluator(workers=1)
+    pairs = list(zip(summary_inputs, summaries))
+    stages['score_summary'] = measure_stage(lambda pair: evaluator.score_summary(*pair), pairs)
+    
+    return results
+
+def compare_with_baseline(results: Dict, baseline: Dict, tolerance: float = 0.25) -> Dict:
+    """Razmerja glede na osnovni zagon; regresija je padec, večji od `tolerance`."""
+    comparison = {}
+    for stage, current in results['stages'].items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference:
+            continue
+        ratios = {
+            'p95_ratio': current['p95_ms'] / reference['p95_ms'] if reference['p95_ms'] else None,
+            'throughput_ratio': current['items_per_sec'] / reference['items_per_sec'],
+            'peak_rss_ratio': current['peak_rss_mb'] / reference['peak_rss_mb']
+        }
+        ratios['regression'] = (
+            ratios['throughput_ratio'] < 1 - tolerance
+            or (ratios['p95_ratio'] is not None and ratios['p95_ratio'] > 1 + tolerance)
+        )
+        comparison[stage] = ratios
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description='Financial News Analysis Benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    extraction = subparsers.add_parser('extraction', help='Izločanje članka iz shranjenih HTML strani')
+    extraction.add_argument('--fixtures', default='fixtures/html', help='Mapa s HTML stranmi')
+    extraction.add_argument('--repeat', type=int, default=20, help='Število ponovitev')
+    
+    cleaner = subparsers.add_parser('cleaner', help='Prepustnost TextCleaner na sintetičnem korpusu')
+    cleaner.add_argument('--articles', type=int, default=100000, help='Število sintetičnih člankov')
+    
+    backends = subparsers.add_parser('backends', help='Primerjava izvajalnih okolij s fp32 potjo')
+    backends.add_argument('--summarizer-model', default='t5-base')
+    backends.add_argument('--sentiment-model', default='ProsusAI/finbert')
+    backends.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    backends.add_argument('--articles', type=int, default=32)
+    backends.add_argument('--onnx-cache', default='data/onnx')
+    
+    profiles = subparsers.add_parser('profiles', help='Latenca in ponovljivost profilov dekodiranja')
+    profiles.add_argument('--summarizer-model', default='t5-base')
+    profiles.add_argument('--profiles', nargs='+', choices=list(DECODING_PROFILES),
+                          default=list(DECODING_PROFILES))
+    profiles.add_argument('--articles', type=int, default=8)
+    profiles.add_argument('--time-budget', type=float, default=0.5, help='Proračun na članek v sekundah')
+    
+    workers = subparsers.add_parser('workers', help='Skaliranje prepustnosti z bazenom procesov')
+    workers.add_argument('--config', default='config/config.yaml')
+    workers.add_argument('--workers', nargs='+', type=int, default=(1, 2, 4))
+    workers.add_argument('--threads-per-worker', type=int, default=None)
+    workers.add_argument('--articles', type=int, default=64)
+    workers.add_argument('--summarizer-model', default=None)
+    workers.add_argument('--sentiment-model', default=None)
+    
+    suite = subparsers.add_parser('suite', help='Vse stopnje cevovoda z majhnimi naključnimi modeli')
+    suite.add_argument('--articles', type=int, default=200)
+    suite.add_argument('--fixtures', default='fixtures/html')
+    suite.add_argument('--models-dir', default=None, help='Mapa za (ponovno) uporabo majhnih modelov')
+    suite.add_argument('--scrape-repeat', type=int, default=10, help='Ponovitve strganja vsake HTML strani')
+    suite.add_argument('--output', default='data/benchmarks/latest.json')
+    # Absolutne meritve so odvisne od računalnika, zato primerjamo le z izrecno podanim osnovnim zagonom
+    suite.add_argument('--baseline', default=None,
+                       help='Osnovni zagon z istega računalnika (npr. fixtures/benchmark_baseline.json)')
+    suite.add_argument('--tolerance', type=float, default=0.25)
+    suite.add_argument('--update-baseline', action='store_true', help='Shrani rezultate kot nov osnovni zagon')
+    
+    args = parser.parse_args()
+    setup_logging()
+    
+    if args.benchmark == 'extraction':
+        results = benchmark_extraction(args.fixtures, args.repeat)
+    elif args.benchmark == 'cleaner':
+        results = benchmark_cleaner(args.articles)
+    elif args.benchmark == 'backends':
+        results = benchmark_backends(
+            args.summarizer_model,
+            args.sentiment_model,
+            args.backends,
+            args.articles,
+            args.onnx_cache
+        )
+    elif args.benchmark == 'profiles':
+        results = benchmark_profiles(
+            args.summarizer_model,
+            args.profiles,
+            args.articles,
+            args.time_budget
+        )
+    elif args.benchmark == 'workers':
+        results = benchmark_workers(
+            args.config,
+            args.workers,
+            args.threads_per_worker,
+            args.articles,
+            args.summarizer_model,
+            args.sentiment_model
+        )
+    
+    elif args.benchmark == 'suite':
+        if args.baseline and not args.update_baseline and not Path(args.baseline).exists():
+            parser.error(f"Osnovni zagon {args.baseline} ne obstaja")
+        results = benchmark_suite(args.articles, args.fixtures, args.models_dir, args.scrape_repeat)
+        if args.baseline and not args.update_baseline:
+            results['baseline'] = compare_with_baseline(
+                results,
+                json.loads(Path(args.baseline).read_text(encoding='utf-8')),
+                args.tolerance
+            )
+        
+        baseline_path = args.baseline or 'fixtures/benchmark_baseline.json'
+        output_path = Path(baseline_path if args.update_baseline else args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    
+    print(json.dumps(results, indent=2))
+    
+    # Hitra pot mora vrniti enak rezultat kot celotno razčlenjevanje na vseh straneh
+    if args.benchmark == 'extraction' and results['matching_pages'] != results['total_pages']:
+        raise SystemExit(1)
+    
+    # Neničelni izhod ob regresiji, da ga lahko uporabi CI
+    if args.benchmark == 'suite' and any(
+        stage['regression'] for stage in results.get('baseline', {}).values()
+    ):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,44 @@
 from grafana_api.grafana_face import GrafanaFace
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime
 
 class SentimentDashboard:
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, datasource: str = "Prometheus",
+                 timeseries_datasource: Optional[str] = None):
         self.grafana = GrafanaFace(
             auth=('admin', 'admin'),
             host=f"http://{host}",
             port=port
         )
+        # Metrike iz src.monitoring.metrics, ki jih Prometheus bere z /metrics
+        self.datasource = datasource
+        # SQLite vir s povzetki iz SentimentTimeSeriesStore (neobvezen)
+        self.timeseries_datasource = timeseries_datasource
         self.logger = logging.getLogger(__name__)
     
     def create_sentiment_dashboard(self, title: str) -> int:
         try:
+            panels = [
+                self._create_sentiment_distribution_panel(),
+                self._create_sentiment_timeline_panel(),
+                self._create_confidence_panel(),
+                self._create_stage_latency_panel(),
+                self._create_throughput_panel(),
+                self._create_batch_size_panel(),
+                self._create_cache_panel()
+            ]
+            if self.timeseries_datasource:
+                panels.append(self._create_daily_rollup_panel())
+            
             dashboard = {
                 "dashboard": {
                     "id": None,
                     "title": title,
                     "tags": ["financial", "sentiment"],
                     "timezone": "browser",
-                    "panels": [
-                        self._create_sentiment_distribution_panel(),
-                        self._create_sentiment_timeline_panel(),
-                        self._create_confidence_panel()
-                    ],
+                    "panels": panels,
                     "refresh": "5m"
                 },
                 "overwrite": True
@@ -38,10 +51,21 @@ class SentimentDashboard:
             self.logger.error(f"Napaka pri ustvarjanju dashboarda: {str(e)}")
             return None
     
+    def _targets(self, *queries: Tuple[str, str]) -> List[Dict]:
+        """PromQL poizvedbe (izraz, legenda) kot Grafana cilji A, B, ..."""
+        return [
+            {"refId": chr(ord('A') + idx), "expr": expr, "legendFormat": legend}
+            for idx, (expr, legend) in enumerate(queries)
+        ]
+    
     def _create_sentiment_distribution_panel(self) -> Dict:
         return {
             "title": "Porazdelitev sentimenta",
             "type": "piechart",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum by (label) (finaintel_sentiment_total)", "{{label}}")
+            ),
             "gridPos": {"h": 8, "w": 12, "x": 0, "y": 0}
         }
     
@@ -49,6 +73,10 @@ class SentimentDashboard:
         return {
             "title": "Časovna vrsta sentimenta",
             "type": "graph",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum by (label) (rate(finaintel_sentiment_total[5m]))", "{{label}}")
+            ),
             "gridPos": {"h": 8, "w": 24, "x": 0, "y": 8}
         }
     
@@ -56,5 +84,76 @@ class SentimentDashboard:
         return {
             "title": "Zaupanje v napovedi",
             "type": "gauge",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum(rate(finaintel_sentiment_confidence_sum[5m])) "
+                 "/ sum(rate(finaintel_sentiment_confidence_count[5m]))", "povprečno zaupanje")
+            ),
             "gridPos": {"h": 8, "w": 12, "x": 12, "y": 0}
-        } 
\ No newline at end of file
+        }
+    
+    def _create_stage_latency_panel(self) -> Dict:
+        return {
+            "title": "Zakasnitev stopenj (p50 / p95)",
+            "type": "graph",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("histogram_quantile(0.5, sum by (le, stage) "
+                 "(rate(finaintel_stage_latency_seconds_bucket[5m])))", "{{stage}} p50"),
+                ("histogram_quantile(0.95, sum by (le, stage) "
+                 "(rate(finaintel_stage_latency_seconds_bucket[5m])))", "{{stage}} p95")
+            ),
+            "gridPos": {"h": 8, "w": 12, "x": 0, "y": 16}
+        }
+    
+    def _create_throughput_panel(self) -> Dict:
+        return {
+            "title": "Žetoni in zapisi na sekundo",
+            "type": "graph",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum by (stage, direction) (rate(finaintel_tokens_total[1m]))",
+                 "{{stage}} žetoni {{direction}}"),
+                ("sum by (stage) (rate(finaintel_stage_items_total[1m]))", "{{stage}} zapisi")
+            ),
+            "gridPos": {"h": 8, "w": 12, "x": 12, "y": 16}
+        }
+    
+    def _create_batch_size_panel(self) -> Dict:
+        return {
+            "title": "Povprečna velikost paketa",
+            "type": "graph",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum by (stage) (rate(finaintel_batch_size_sum[5m])) "
+                 "/ sum by (stage) (rate(finaintel_batch_size_count[5m]))", "{{stage}}")
+            ),
+            "gridPos": {"h": 8, "w": 12, "x": 0, "y": 24}
+        }
+    
+    def _create_cache_panel(self) -> Dict:
+        return {
+            "title": "Zadetki predpomnilnika in stopnje povzemanja",
+            "type": "graph",
+            "datasource": self.datasource,
+            "targets": self._targets(
+                ("sum(rate(finaintel_cache_requests_total{result=\"hit\"}[5m])) "
+                 "/ sum(rate(finaintel_cache_requests_total[5m]))", "delež zadetkov"),
+                ("sum by (tier) (rate(finaintel_summary_tier_total[5m]))", "{{tier}}")
+            ),
+            "gridPos": {"h": 8, "w": 12, "x": 12, "y": 24}
+        }
+    
+    def _create_daily_rollup_panel(self) -> Dict:
+        # Bere dnevne povzetke, zato poizvedba ne pregleduje surovih zapisov
+        query = (
+            "SELECT bucket AS time, source || ' ' || label AS metric, count AS value "
+            "FROM sentiment_rollup WHERE resolution = 'day' ORDER BY bucket"
+        )
+        return {
+            "title": "Dnevni sentiment po virih",
+            "type": "graph",
+            "datasource": self.timeseries_datasource,
+            "targets": [{"refId": "A", "rawQueryText": query, "queryText": query, "timeColumns": ["time"]}],
+            "gridPos": {"h": 8, "w": 24, "x": 0, "y": 32}
+        }
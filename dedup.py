@@ -0,0 +1,123 @@
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+import numpy as np
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+class NearDuplicateIndex:
+    """Iskanje skoraj podvojenih člankov z MinHash podpisi in LSH pasovi.
+    
+    Hrani le kanonične članke iz drsečega časovnega okna. Za kanonične članke
+    lahko shrani rezultat modelov, da ga podvojeni članki uporabijo znova.
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, window_hours: float = 48, max_entries: int = 50000,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm mora biti deljiv s številom pasov")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.window_seconds = window_hours * 3600
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        
+        # Naključne permutacije oblike (a * x + b) mod p
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+        
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray, List[Tuple[int, bytes]]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        self._results: Dict[str, Any] = {}
+    
+    def signature(self, text: str) -> np.ndarray:
+        tokens = text.split()
+        if len(tokens) <= self.shingle_size:
+            shingles = {' '.join(tokens)}
+        else:
+            shingles = {
+                ' '.join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            }
+        
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=0)
+    
+    def check(self, key: str, text: str, timestamp: Optional[float] = None) -> Optional[str]:
+        """Vrne ključ kanoničnega članka, če je `text` skoraj podvojen, sicer ga doda v indeks.
+        
+        Besedila z manj kot `shingle_size` besedami se ne preverjajo; sicer bi imela vsa
+        (npr. prazna) besedila isti edini shingle in bi bila podvojena drug drugega.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self._expire(timestamp)
+        
+        if key in self._entries:
+            return None
+        
+        tokens = text.split() if text else []
+        if len(tokens) < self.shingle_size:
+            return None
+        
+        signature = self.signature(text)
+        band_keys = [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+        
+        # Kandidati so članki, ki se ujemajo v vsaj enem pasu
+        candidates = set()
+        for band_key in band_keys:
+            candidates |= self._buckets.get(band_key, set())
+        
+        best_key, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = float(np.mean(self._entries[candidate][1] == signature))
+            if similarity > best_similarity:
+                best_key, best_similarity = candidate, similarity
+        
+        if best_key is not None and best_similarity >= self.threshold:
+            return best_key
+        
+        self._entries[key] = (timestamp, signature, band_keys)
+        for band_key in band_keys:
+            self._buckets[band_key].add(key)
+        return None
+    
+    def set_result(self, key: str, result: Any):
+        if key in self._entries:
+            self._results[key] = result
+    
+    def get_result(self, key: str) -> Optional[Any]:
+        return self._results.get(key)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _expire(self, now: float):
+        while self._entries:
+            key, (timestamp, _, band_keys) = next(iter(self._entries.items()))
+            if now - timestamp <= self.window_seconds and len(self._entries) < self.max_entries:
+                break
+            self._entries.popitem(last=False)
+            self._results.pop(key, None)
+            for band_key in band_keys:
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
@@ -2,46 +2,339 @@ from rouge_score import rouge_scorer
 from sklearn.metrics import classification_report, confusion_matrix
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+ROUGE_METRICS = ['rouge1', 'rouge2', 'rougeL']
+
+_worker_scorer = None
+
+def _init_rouge_worker():
+    global _worker_scorer
+    _worker_scorer = rouge_scorer.RougeScorer(ROUGE_METRICS, use_stemmer=True)
+
+def _score_shard(start: int, original_texts: List[str],
+                 generated_summaries: List[str]) -> Tuple[int, np.ndarray]:
+    """ROUGE F1 ocene dela parov kot matrika (pari x metrike)."""
+    if _worker_scorer is None:
+        _init_rouge_worker()
+    block = np.empty((len(original_texts), len(ROUGE_METRICS)), dtype=np.float64)
+    for row, (original, summary) in enumerate(zip(original_texts, generated_summaries)):
+        scores = _worker_scorer.score(original, summary)
+        block[row] = [scores[metric].fmeasure for metric in ROUGE_METRICS]
+    return start, block
+
+class RougeAccumulator:
+    """Ocene ROUGE v NumPy matriki s sprotnim povprečjem in varianco.
+    
+    Bloki ocen lahko prihajajo v poljubnem vrstnem redu; `snapshot` vrne delne
+    rezultate med izvajanjem, `results` pa končne v obliki `evaluate_summaries`.
+    """
+    
+    def __init__(self, capacity: int = 0):
+        self.scores = np.full((capacity, len(ROUGE_METRICS)), np.nan)
+        self.total = capacity
+        self.count = 0
+        self.mean = np.zeros(len(ROUGE_METRICS))
+        self.m2 = np.zeros(len(ROUGE_METRICS))
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def add(self, start: int, block: np.ndarray):
+        with self._lock:
+            end = start + len(block)
+            if end > len(self.scores):
+                grown = np.full((max(end, 2 * len(self.scores)), len(ROUGE_METRICS)), np.nan)
+                grown[:len(self.scores)] = self.scores
+                self.scores = grown
+            self.scores[start:end] = block
+            self._size = max(self._size, end)
+            
+            # Združevanje sprotnih statistik po Chanu in sod.
+            count = len(block)
+            block_mean = block.mean(axis=0)
+            block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+            delta = block_mean - self.mean
+            merged = self.count + count
+            self.mean = self.mean + delta * count / merged
+            self.m2 = self.m2 + block_m2 + delta ** 2 * self.count * count / merged
+            self.count = merged
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            std = np.sqrt(self.m2 / self.count) if self.count else np.zeros(len(ROUGE_METRICS))
+            return {
+                'completed': self.count,
+                'total': max(self.total, self._size),
+                'mean_scores': dict(zip(ROUGE_METRICS, self.mean.tolist())),
+                'std_scores': dict(zip(ROUGE_METRICS, std.tolist()))
+            }
+    
+    def results(self) -> Dict:
+        with self._lock:
+            scores = self.scores[:self._size]
+            # Povprečja iz celotne matrike, da se ujemajo z np.mean nad seznami
+            return {
+                'detailed_scores': {
+                    metric: scores[:, column] for column, metric in enumerate(ROUGE_METRICS)
+                },
+                'average_scores': {
+                    metric: np.mean(scores[:, column]) for column, metric in enumerate(ROUGE_METRICS)
+                }
+            }
+
+class StreamingRougeEvaluator:
+    """ROUGE evalvacija parov, ki prihajajo sproti (npr. iz cevovoda).
+    
+    Pari se zbirajo v dele velikosti `shard_size`; polni deli se ocenijo v skupini
+    procesov, medtem ko cevovod teče naprej. V obdelavi je največ `max_inflight`
+    delov, zato se hranijo le besedila teh delov. Procesi se privzeto zaženejo
+    s `spawn`, saj razvejitev (fork) procesa z nitmi in naloženimi modeli ni varna.
+    """
+    
+    def __init__(self, workers: int = 1, shard_size: int = 500, max_inflight: Optional[int] = None,
+                 start_method: str = 'spawn'):
+        self.workers = workers
+        self.shard_size = shard_size
+        self.max_inflight = max_inflight or 2 * workers
+        self.start_method = start_method
+        self.accumulator = RougeAccumulator()
+        self.logger = logging.getLogger(__name__)
+        self._originals: List[str] = []
+        self._summaries: List[str] = []
+        self._next_start = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = deque()
+    
+    def add(self, original_text: str, summary: str):
+        self._originals.append(original_text)
+        self._summaries.append(summary)
+        if len(self._originals) >= self.shard_size:
+            self._submit_shard()
+    
+    def results(self) -> Dict:
+        """Oceni preostale pare in vrne rezultate v obliki `evaluate_summaries`."""
+        try:
+            if self._originals:
+                self._submit_shard()
+            while self._pending:
+                self.accumulator.add(*self._pending.popleft().result())
+        except Exception as e:
+            self.logger.error(f"Napaka pri evalvaciji povzetkov: {str(e)}")
+        finally:
+            self.close()
+        return self.accumulator.results()
+    
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _submit_shard(self):
+        shard = (self._next_start, self._originals, self._summaries)
+        self._next_start += len(self._originals)
+        self._originals, self._summaries = [], []
+        
+        # En sam (zadnji) del brez že zagnanih procesov ocenimo v tem procesu
+        if self.workers <= 1 or (self._executor is None and len(shard[1]) < self.shard_size):
+            self.accumulator.add(*_score_shard(*shard))
+            return
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_rouge_worker
+            )
+        self._pending.append(self._executor.submit(_score_shard, *shard))
+        while self._pending and (len(self._pending) > self.max_inflight or self._pending[0].done()):
+            self.accumulator.add(*self._pending.popleft().result())
+
+SENTIMENT_LABELS = ['negative', 'neutral', 'positive']
+
+class SentimentAccumulator:
+    """Sprotna evalvacija sentimenta s stalno porabo pomnilnika.
+    
+    Hrani matriko zmede fiksne velikosti, sprotno povprečje in varianco zaupanja
+    ter histogram zaupanja, iz katerega oceni kvantile. Posodobitev je O(1),
+    akumulatorje posameznih procesov pa lahko združimo z `merge`.
+    """
+    
+    def __init__(self, labels: List[str] = SENTIMENT_LABELS, bins: int = 100):
+        self.labels = list(labels)
+        self.label_index = {label: idx for idx, label in enumerate(self.labels)}
+        self.confusion = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.logger = logging.getLogger(__name__)
+    
+    def update(self, true_sentiment: str, predicted_sentiment: str, confidence: float):
+        true_idx = self.label_index.get(true_sentiment)
+        predicted_idx = self.label_index.get(predicted_sentiment)
+        if true_idx is None or predicted_idx is None:
+            self.logger.warning(f"Neznana oznaka sentimenta: {true_sentiment} / {predicted_sentiment}")
+            return
+        self.confusion[true_idx, predicted_idx] += 1
+        
+        # Welfordova posodobitev povprečja in variance
+        self.count += 1
+        delta = confidence - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (confidence - self.mean)
+        self.min = min(self.min, confidence)
+        self.max = max(self.max, confidence)
+        
+        bins = len(self.histogram)
+        self.histogram[min(max(int(confidence * bins), 0), bins - 1)] += 1
+    
+    def merge(self, other: 'SentimentAccumulator'):
+        if other.labels != self.labels or len(other.histogram) != len(self.histogram):
+            raise ValueError("Akumulatorja imata različne oznake ali histogram")
+        self.confusion += other.confusion
+        self.histogram += other.histogram
+        if other.count:
+            merged = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / merged
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / merged
+            self.count = merged
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q: float) -> float:
+        """Kvantil zaupanja iz histograma (napaka največ širina enega razreda)."""
+        if not self.count:
+            return float('nan')
+        cumulative = np.cumsum(self.histogram)
+        target = q * self.count
+        bin_idx = int(np.searchsorted(cumulative, target))
+        bin_idx = min(bin_idx, len(self.histogram) - 1)
+        before = cumulative[bin_idx - 1] if bin_idx else 0
+        in_bin = self.histogram[bin_idx]
+        fraction = (target - before) / in_bin if in_bin else 0.0
+        value = (bin_idx + fraction) / len(self.histogram)
+        return float(min(max(value, self.min), self.max))
+    
+    def report(self) -> Dict:
+        """Poročilo v obliki `FinancialNewsEvaluator.evaluate_sentiment`."""
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        correct = np.diag(self.confusion)
+        # Kot sklearn: le oznake, ki se pojavijo v resničnih ali napovedanih vrednostih
+        present = [idx for idx in range(len(self.labels)) if support[idx] or predicted[idx]]
+        
+        report = {}
+        for idx in present:
+            precision = correct[idx] / predicted[idx] if predicted[idx] else 0.0
+            recall = correct[idx] / support[idx] if support[idx] else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            report[self.labels[idx]] = {
+                'precision': float(precision),
+                'recall': float(recall),
+                'f1-score': float(f1),
+                'support': int(support[idx])
+            }
+        
+        total = int(support.sum())
+        report['accuracy'] = float(correct.sum() / total) if total else 0.0
+        metrics = ['precision', 'recall', 'f1-score']
+        per_label = [report[self.labels[idx]] for idx in present]
+        weights = np.array([entry['support'] for entry in per_label], dtype=np.float64)
+        report['macro avg'] = {
+            metric: float(np.mean([entry[metric] for entry in per_label])) if per_label else 0.0
+            for metric in metrics
+        }
+        report['weighted avg'] = {
+            metric: float(np.average([entry[metric] for entry in per_label], weights=weights))
+            if total else 0.0
+            for metric in metrics
+        }
+        report['macro avg']['support'] = total
+        report['weighted avg']['support'] = total
+        
+        std = np.sqrt(self.m2 / self.count) if self.count else float('nan')
+        return {
+            'classification_report': report,
+            'confusion_matrix': self.confusion[np.ix_(present, present)],
+            'confidence_analysis': {
+                'mean_confidence': self.mean if self.count else float('nan'),
+                'std_confidence': float(std),
+                'min_confidence': float(self.min) if self.count else float('nan'),
+                'max_confidence': float(self.max) if self.count else float('nan'),
+                'quantiles': {
+                    f"p{int(q * 100)}": self.quantile(q) for q in (0.5, 0.9, 0.99)
+                },
+                'histogram': self.histogram.copy()
+            }
+        }
+
 class FinancialNewsEvaluator:
-    def __init__(self):
-        self.rouge_scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+    def __init__(self, workers: Optional[int] = None, shard_size: int = 500,
+                 start_method: str = 'spawn'):
+        self.rouge_scorer = rouge_scorer.RougeScorer(ROUGE_METRICS, use_stemmer=True)
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.start_method = start_method
+        # Delni rezultati tekoče evalvacije, berljivi iz drugih niti
+        self.summary_progress: Optional[RougeAccumulator] = None
         self.logger = logging.getLogger(__name__)
         
     def evaluate_summaries(self, original_texts: List[str], generated_summaries: List[str]) -> Dict:
-        """Evalvacija povzetkov z ROUGE metrikami."""
+        """Evalvacija povzetkov z ROUGE metrikami.
+        
+        Pari se razdelijo na dele velikosti `shard_size`, ki jih oceni skupina procesov;
+        majhni nabori se ocenijo v tem procesu.
+        """
         try:
-            rouge_scores = {
-                'rouge1': [],
-                'rouge2': [],
-                'rougeL': []
-            }
+            pairs = min(len(original_texts), len(generated_summaries))
+            accumulator = RougeAccumulator(pairs)
+            self.summary_progress = accumulator
             
-            for original, summary in zip(original_texts, generated_summaries):
-                scores = self.rouge_scorer.score(original, summary)
-                for metric in rouge_scores.keys():
-                    rouge_scores[metric].append(scores[metric].fmeasure)
+            shards = [
+                (start, original_texts[start:start + self.shard_size],
+                 generated_summaries[start:start + self.shard_size])
+                for start in range(0, pairs, self.shard_size)
+            ]
+            if self.workers <= 1 or len(shards) <= 1:
+                for shard in shards:
+                    accumulator.add(*_score_shard(*shard))
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(shards)),
+                                         mp_context=multiprocessing.get_context(self.start_method),
+                                         initializer=_init_rouge_worker) as executor:
+                    futures = [executor.submit(_score_shard, *shard) for shard in shards]
+                    for future in as_completed(futures):
+                        accumulator.add(*future.result())
             
-            # Izračunaj povprečja
-            avg_scores = {
-                metric: np.mean(scores) 
-                for metric, scores in rouge_scores.items()
-            }
-            
-            return {
-                'detailed_scores': rouge_scores,
-                'average_scores': avg_scores
-            }
+            return accumulator.results()
             
         except Exception as e:
             self.logger.error(f"Napaka pri evalvaciji povzetkov: {str(e)}")
             return {}
     
+    def streaming_summaries(self) -> StreamingRougeEvaluator:
+        """Sprotna evalvacija povzetkov z istimi `workers`, `shard_size` in `start_method`."""
+        streaming = StreamingRougeEvaluator(self.workers, self.shard_size, start_method=self.start_method)
+        self.summary_progress = streaming.accumulator
+        return streaming
+    
+    def score_summary(self, original_text: str, summary: str) -> Dict[str, float]:
+        """ROUGE F1 ocene za en par besedilo-povzetek."""
+        scores = self.rouge_scorer.score(original_text, summary)
+        return {metric: scores[metric].fmeasure for metric in ROUGE_METRICS}
+    
     def evaluate_sentiment(self, true_sentiments: List[str], 
                          predicted_sentiments: List[str],
                          confidence_scores: List[float]) -> Dict:
@@ -148,6 +441,8 @@ class FinancialNewsEvaluator:
             report.append(f"- Standardni odklon: {conf_analysis['std_confidence']:.4f}")
             report.append(f"- Min zaupanje: {conf_analysis['min_confidence']:.4f}")
             report.append(f"- Max zaupanje: {conf_analysis['max_confidence']:.4f}")
+            for name, value in conf_analysis.get('quantiles', {}).items():
+                report.append(f"- Kvantil {name}: {value:.4f}")
             
             return "\n".join(report)
             
@@ -1,26 +1,45 @@
 import gradio as gr
+import re
+import tempfile
+import time
 import validators
-from typing import List, Dict, Tuple
-from src.data_collection.news_scraper import FinancialNewsScraper
-from src.preprocessing.text_cleaner import TextCleaner
-from src.summarization.summarizer import NewsSummarizer
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Tuple
+from src.data_collection.news_scraper import ScrapedArticle
+from src.preprocessing.keyword_matcher import get_matcher
+from src.summarization.summarizer import DECODING_PROFILES
 from src.sentiment.analyzer import FinancialSentimentAnalyzer
+from src.models.model_registry import ModelRegistry, get_registry
+from src.interface.serving import AnalysisServer, ServerBusyError
 import logging
 
+BULK_COLUMNS = ["URL", "Naslov", "Ključne besede", "Povzetek", "Sentiment", "Zaupanje", "Stanje"]
+
 class FinancialNewsGUI:
-    def __init__(self, config: Dict):
-        self.scraper = FinancialNewsScraper()
-        self.cleaner = TextCleaner()
-        self.summarizer = NewsSummarizer(config['summarization']['model_name'])
-        self.sentiment_analyzer = FinancialSentimentAnalyzer(
-            config['sentiment_analysis']['model_name']
-        )
+    def __init__(self, config: Dict, registry: Optional[ModelRegistry] = None):
+        # Modele, strgalnik in čistilnik delimo s cevovodom prek registra
+        self.registry = registry or get_registry(config)
+        self.scraper = self.registry.scraper()
+        self.cleaner = self.registry.cleaner()
+        self.summary_config = config['summarization']
+        self.summary_router = self.registry.summary_router()
+        # Strganje, povzemanje in sentiment vseh uporabnikov gredo skozi skupne mikro pakete
+        self.serving_config = config['serving']
+        self.server = AnalysisServer(self.registry, config)
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def sentiment_analyzer(self) -> FinancialSentimentAnalyzer:
+        return self.registry.sentiment_analyzer()
+    
     def validate_url(self, url: str) -> bool:
         return validators.url(url) is True
     
-    def process_article(self, url: str, keywords: str) -> Tuple[str, str, str, float]:
+    def process_article(self, url: str, keywords: str,
+                        profile: Optional[str] = None) -> Tuple[str, str, str, float]:
+        start = time.perf_counter()
         try:
             # Preveri URL
             if not self.validate_url(url):
@@ -30,15 +49,12 @@ class FinancialNewsGUI:
             keywords_list = [k.strip() for k in keywords.split(',') if k.strip()]
             
             # Pridobi članek
-            articles = self.scraper.scrape_url(url)
+            articles = self.server.scrape(url)
             if not articles:
                 return "Napaka", "Ni najdenih člankov", "neutral", 0.0
             
             # Filtriraj po ključnih besedah
-            filtered_articles = []
-            for article in articles:
-                if any(kw.lower() in article.content.lower() for kw in keywords_list):
-                    filtered_articles.append(article)
+            filtered_articles = self.filter_articles(articles, keywords_list)
             
             if not filtered_articles:
                 return "Napaka", "Ni člankov z izbranimi ključnimi besedami", "neutral", 0.0
@@ -46,50 +62,214 @@ class FinancialNewsGUI:
             # Vzemi prvi ujemajoči članek
             article = filtered_articles[0]
             
-            # Očisti in povzemi besedilo
-            cleaned_text = self.cleaner.clean_text(article.content)
-            summary = self.summarizer.summarize(cleaned_text)
+            # Očisti in povzemi besedilo; usmerjevalnik izbere stopnjo povzemanja
+            sentences = self.cleaner.clean_sentences(article.content)
+            routed = self.server.summarize(' '.join(sentences), sentences, profile)
+            summary = routed.summary
             
             # Analiziraj sentiment
-            sentiment_result = self.sentiment_analyzer.analyze_sentiment(summary)
+            sentiment_result = self.server.score(summary, routed.sentences)
+            if sentiment_result is None:
+                return article.title, summary, "neutral", 0.0
             
             return (
                 article.title,
                 summary,
-                sentiment_result.sentiment,
+                getattr(sentiment_result, 'intensity', sentiment_result.sentiment),
                 sentiment_result.confidence
             )
             
+        except ServerBusyError as e:
+            self.logger.warning(f"Zahteva zavrnjena: {str(e)}")
+            return "Napaka", "Strežnik je preobremenjen, poskusite znova", "neutral", 0.0
+        
         except Exception as e:
             self.logger.error(f"Napaka pri procesiranju članka: {str(e)}")
             return "Napaka", str(e), "neutral", 0.0
+        
+        finally:
+            self.server.record_request(time.perf_counter() - start)
+    
+    def filter_articles(self, articles: List[ScrapedArticle],
+                        keywords_list: List[str]) -> List[ScrapedArticle]:
+        # Brez ključnih besed ne filtriramo
+        if not keywords_list:
+            return list(articles)
+        matcher = get_matcher(keywords_list)
+        return [article for article in articles if matcher.contains_any(article.content)]
+    
+    def parse_url_list(self, text: str, file_path: Optional[str] = None) -> List[str]:
+        """Veljavni URL-ji brez ponovitev iz besedila in naložene datoteke (.txt ali .csv)."""
+        content = text or ""
+        if file_path:
+            content += "\n" + Path(file_path).read_text(encoding='utf-8', errors='ignore')
+        candidates = (token.strip('"\'') for token in re.split(r'[\s,;]+', content))
+        urls = list(dict.fromkeys(url for url in candidates if url and self.validate_url(url)))
+        return urls[:self.serving_config['bulk_max_urls']]
+    
+    def iter_bulk(self, urls: List[str], keywords_list: List[str],
+                  profile: Optional[str] = None) -> Iterator[List]:
+        """Vrstice BULK_COLUMNS v vrstnem redu, kot se posamezni URL-ji zaključijo.
+        
+        Vsi URL-ji gredo hkrati v strežbo, zato se strganja izvajajo sočasno,
+        povzemanje in sentiment pa v skupnih paketih.
+        """
+        pending: Dict[Future, Tuple[str, str]] = {}
+        articles: Dict[str, ScrapedArticle] = {}
+        summaries: Dict[str, str] = {}
+        matcher = get_matcher(keywords_list)
+        
+        def row(url: str, status: str, sentiment: str = "", confidence: float = 0.0) -> List:
+            article = articles.get(url)
+            matched = ', '.join(matcher.matched_keywords(article.content)) if article else ""
+            return [url, article.title if article else "", matched, summaries.get(url, ""),
+                    sentiment, round(confidence, 4), status]
+        
+        for url in urls:
+            try:
+                pending[self.server.submit_scrape(url)] = ('scrape', url)
+            except ServerBusyError:
+                yield row(url, "Strežnik je preobremenjen")
+        
+        while pending:
+            done, _ = wait(pending, timeout=self.server.request_timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                for _, url in pending.values():
+                    yield row(url, "Časovna omejitev")
+                return
+            
+            for future in done:
+                stage, url = pending.pop(future)
+                try:
+                    result = future.result()
+                    if stage == 'scrape':
+                        filtered_articles = self.filter_articles(result, keywords_list)
+                        if not filtered_articles:
+                            yield row(url, "Ni člankov z izbranimi ključnimi besedami" if result
+                                      else "Ni najdenih člankov")
+                            continue
+                        articles[url] = filtered_articles[0]
+                        sentences = self.cleaner.clean_sentences(articles[url].content)
+                        pending[self.server.submit_summarize(' '.join(sentences), sentences, profile)] = ('summarize', url)
+                    elif stage == 'summarize':
+                        summaries[url] = result.summary
+                        pending[self.server.submit_score(result.summary, result.sentences)] = ('score', url)
+                    elif result is None:
+                        yield row(url, "Napaka pri analizi sentimenta")
+                    else:
+                        yield row(url, "OK", getattr(result, 'intensity', result.sentiment), result.confidence)
+                
+                except ServerBusyError:
+                    yield row(url, "Strežnik je preobremenjen")
+                except Exception as e:
+                    self.logger.error(f"Napaka pri paketni obdelavi {url}: {str(e)}")
+                    yield row(url, f"Napaka: {str(e)}")
+    
+    def process_bulk(self, urls_text: str, urls_file: Optional[str], keywords: str,
+                     profile: Optional[str] = None) -> Iterator[Tuple[pd.DataFrame, str, Optional[List[str]]]]:
+        urls = self.parse_url_list(urls_text, urls_file)
+        if not urls:
+            yield pd.DataFrame(columns=BULK_COLUMNS), "Ni veljavnih URL-jev", None
+            return
+        
+        keywords_list = [k.strip() for k in keywords.split(',') if k.strip()]
+        start = time.perf_counter()
+        rows = []
+        for result_row in self.iter_bulk(urls, keywords_list, profile):
+            rows.append(result_row)
+            yield pd.DataFrame(rows, columns=BULK_COLUMNS), f"Obdelano {len(rows)}/{len(urls)}", None
+        
+        results = pd.DataFrame(rows, columns=BULK_COLUMNS)
+        status = f"Končano: {len(rows)} URL-jev v {time.perf_counter() - start:.1f} s"
+        yield results, status, self.export_results(results)
+    
+    def export_results(self, results: pd.DataFrame) -> List[str]:
+        """Zapiše rezultate paketne analize v CSV in Parquet za prenos."""
+        directory = Path(tempfile.mkdtemp(prefix='finaintel_bulk_'))
+        files = []
+        try:
+            csv_path = directory / "rezultati.csv"
+            results.to_csv(csv_path, index=False)
+            files.append(str(csv_path))
+            parquet_path = directory / "rezultati.parquet"
+            results.to_parquet(parquet_path, index=False)
+            files.append(str(parquet_path))
+        except Exception as e:
+            self.logger.error(f"Napaka pri izvozu rezultatov: {str(e)}")
+        return files
+    
+    def serving_stats(self) -> Dict[str, Dict]:
+        return self.server.stats()
     
     def launch_interface(self):
         with gr.Blocks(title="Analizator finančnih novic") as interface:
             gr.Markdown("# Analizator finančnih novic")
             
             with gr.Row():
-                url_input = gr.Textbox(
-                    label="URL članka",
-                    placeholder="Vnesite URL finančnega članka..."
-                )
                 keywords_input = gr.Textbox(
                     label="Ključne besede",
                     placeholder="Vnesite ključne besede, ločene z vejico..."
                 )
+                profile_input = gr.Dropdown(
+                    choices=list(DECODING_PROFILES),
+                    value=self.summary_config['profile'],
+                    label="Profil povzemanja"
+                )
             
-            analyze_btn = gr.Button("Analiziraj")
+            with gr.Tab("Posamezen članek"):
+                url_input = gr.Textbox(
+                    label="URL članka",
+                    placeholder="Vnesite URL finančnega članka..."
+                )
+                
+                analyze_btn = gr.Button("Analiziraj")
+                
+                with gr.Row():
+                    title_output = gr.Textbox(label="Naslov")
+                    summary_output = gr.Textbox(label="Povzetek")
+                    sentiment_output = gr.Label(label="Sentiment")
             
-            with gr.Row():
-                title_output = gr.Textbox(label="Naslov")
-                summary_output = gr.Textbox(label="Povzetek")
-                sentiment_output = gr.Label(label="Sentiment")
+            with gr.Tab("Paketna analiza"):
+                with gr.Row():
+                    urls_input = gr.Textbox(
+                        label="URL-ji člankov",
+                        placeholder="En URL na vrstico...",
+                        lines=8
+                    )
+                    urls_file = gr.File(
+                        label="Datoteka z URL-ji",
+                        file_types=[".txt", ".csv"],
+                        type="filepath"
+                    )
+                
+                bulk_btn = gr.Button("Analiziraj vse")
+                bulk_status = gr.Markdown()
+                bulk_output = gr.Dataframe(headers=BULK_COLUMNS, wrap=True, label="Rezultati")
+                bulk_files = gr.File(label="Prenos (CSV, Parquet)", file_count="multiple")
             
             analyze_btn.click(
                 fn=self.process_article,
-                inputs=[url_input, keywords_input],
+                inputs=[url_input, keywords_input, profile_input],
                 outputs=[title_output, summary_output, sentiment_output]
             )
+            
+            bulk_btn.click(
+                fn=self.process_bulk,
+                inputs=[urls_input, urls_file, keywords_input, profile_input],
+                outputs=[bulk_output, bulk_status, bulk_files]
+            )
+            
+            with gr.Accordion("Statistika strežbe", open=False):
+                stats_output = gr.JSON(label="Zakasnitve in zapolnjenost paketov")
+                stats_btn = gr.Button("Osveži")
+            
+            stats_btn.click(fn=self.serving_stats, inputs=[], outputs=[stats_output])
+        
+        # Sočasne zahteve morajo priti do strežbe hkrati, da se lahko združijo v pakete
+        interface.queue(
+            default_concurrency_limit=self.serving_config['concurrency_limit'],
+            max_size=self.serving_config['max_queue_size']
+        )
         
         # Zaženi vmesnik
         interface.launch(share=True) 
\ No newline at end of file
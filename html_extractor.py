@@ -0,0 +1,225 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import CData, NavigableString, Tag
+from typing import Dict, List, Optional, Tuple
+import logging
+from pydantic import BaseModel
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+class SiteProfile(BaseModel):
+    content_selectors: List[str]
+    title_selectors: List[str]
+
+DEFAULT_PROFILE = SiteProfile(
+    content_selectors=[
+        'article',
+        '.article-content',
+        '.article-body',
+        '#article-body',
+        '.story-content'
+    ],
+    title_selectors=['h1', '.article-title', '.headline']
+)
+
+# Selektorji posameznih strani imajo prednost pred privzetimi
+SITE_PROFILES: Dict[str, SiteProfile] = {
+    'www.reuters.com': SiteProfile(
+        content_selectors=['.article-body__content p', 'article'],
+        title_selectors=['h1']
+    ),
+    'www.ft.com': SiteProfile(
+        content_selectors=['#article-body', '.article__content-body'],
+        title_selectors=['h1', '.o-topper__headline']
+    ),
+    'www.bloomberg.com': SiteProfile(
+        content_selectors=['.body-content', 'article'],
+        title_selectors=['h1', '.headline']
+    ),
+    'www.finance.si': SiteProfile(
+        content_selectors=['.article-content', 'article'],
+        title_selectors=['h1', '.article-title']
+    )
+}
+
+Selector = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Elementi znotraj vsebnika članka, ki niso del besedila
+NOISE_SELECTORS = ['script', 'style', '.ad-slot']
+
+# Selektor, ki se konča s temi oznakami, izbere posamezne odstavke in združi vse zadetke;
+# ostali selektorji izberejo en vsebnik (prvi zadetek)
+PARAGRAPH_TAGS = {'p', 'li'}
+
+# Oznake, ki začnejo nov blok besedila; med bloke vstavimo presledek
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul'
+}
+
+def parse_selector(selector: str) -> Selector:
+    """Razčleni preprost selektor (`tag`, `.razred`, `#id`, `tag.razred`) v (tag, razred, id)."""
+    tag, css_class, element_id = selector, None, None
+    if '#' in tag:
+        tag, element_id = tag.split('#', 1)
+    if '.' in tag:
+        tag, css_class = tag.split('.', 1)
+    return tag or None, css_class, element_id
+
+def is_paragraph_selector(selector: str) -> bool:
+    return parse_selector(selector.split()[-1])[0] in PARAGRAPH_TAGS
+
+def block_text(element: Tag) -> str:
+    """Besedilo elementa, v katerem so odstavki, naslovi in alineje ločeni s presledkom."""
+    blocks: List[str] = []
+    current: List[str] = []
+    _collect_blocks(element, blocks, current)
+    _flush_block(blocks, current)
+    return ' '.join(blocks)
+
+def _collect_blocks(element: Tag, blocks: List[str], current: List[str]):
+    for child in element.children:
+        if isinstance(child, Tag):
+            if child.name in BLOCK_TAGS:
+                _flush_block(blocks, current)
+                _collect_blocks(child, blocks, current)
+                _flush_block(blocks, current)
+            else:
+                _collect_blocks(child, blocks, current)
+        elif type(child) in (NavigableString, CData):
+            # Komentarji in deklaracije niso del besedila (kot pri get_text)
+            current.append(str(child))
+
+def _flush_block(blocks: List[str], current: List[str]):
+    text = ' '.join(''.join(current).split())
+    if text:
+        blocks.append(text)
+    current.clear()
+
+def _matches(selector: Selector, name: str, attrs: Dict) -> bool:
+    tag, css_class, element_id = selector
+    if tag and tag != name:
+        return False
+    if element_id and attrs.get('id') != element_id:
+        return False
+    if css_class:
+        classes = attrs.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        if css_class not in classes:
+            return False
+    return True
+
+class CompiledProfile:
+    """Profil strani z vnaprej pripravljenim filtrom za delno razčlenjevanje."""
+    
+    def __init__(self, profile: SiteProfile):
+        self.content_selectors = profile.content_selectors
+        self.title_selectors = profile.title_selectors
+        
+        # Razčlenimo le vsebnike članka, naslove, odstavke in <title>
+        parsed = [
+            parse_selector(part)
+            for s in self.content_selectors + self.title_selectors
+            for part in s.split()
+        ]
+        parsed += [('p', None, None), ('title', None, None)]
+        self.strainer = SoupStrainer(
+            lambda name, attrs=None: any(_matches(sel, name, attrs or {}) for sel in parsed)
+        )
+
+class HtmlExtractor:
+    """Izločanje naslova in vsebine članka iz HTML-ja.
+    
+    Privzeto uporablja hitrejši razčlenjevalnik (lxml, če je na voljo) in zgradi
+    drevo le iz elementov, ki jih potrebujejo selektorji profila strani.
+    """
+    
+    def __init__(self, parser: str = DEFAULT_PARSER, restricted: bool = True,
+                 profiles: Optional[Dict[str, SiteProfile]] = None):
+        self.parser = parser
+        self.restricted = restricted
+        self.profiles = SITE_PROFILES if profiles is None else profiles
+        self.logger = logging.getLogger(__name__)
+        self._resolved: Dict[str, CompiledProfile] = {}
+    
+    def resolve_profile(self, host: str) -> CompiledProfile:
+        # Profil za posamezen strežnik pripravimo le enkrat
+        if host not in self._resolved:
+            profile = self.profiles.get(host)
+            if profile:
+                profile = SiteProfile(
+                    content_selectors=profile.content_selectors + [
+                        s for s in DEFAULT_PROFILE.content_selectors
+                        if s not in profile.content_selectors
+                    ],
+                    title_selectors=profile.title_selectors + [
+                        s for s in DEFAULT_PROFILE.title_selectors
+                        if s not in profile.title_selectors
+                    ]
+                )
+            self._resolved[host] = CompiledProfile(profile or DEFAULT_PROFILE)
+        return self._resolved[host]
+    
+    def extract(self, html: str, host: str) -> Tuple[str, str]:
+        """Vrne (naslov, vsebina) članka z uporabo profila strani za `host`."""
+        profile = self.resolve_profile(host)
+        soup = BeautifulSoup(
+            html,
+            self.parser,
+            parse_only=profile.strainer if self.restricted else None
+        )
+        
+        # Poskusi najti glavni članek
+        article_content = ""
+        for selector in profile.content_selectors:
+            matches = self._select_content(soup, selector)
+            if matches:
+                # Odstrani nepotrebne elemente
+                for content in matches:
+                    for noise_selector in NOISE_SELECTORS:
+                        for tag in content.select(noise_selector):
+                            tag.decompose()
+                article_content = ' '.join(block_text(content) for content in matches)
+                break
+        
+        if not article_content:
+            # Če ne najdemo specifičnega selektorja, vzemi vse odstavke
+            paragraphs = self._outermost(soup.find_all('p'))
+            article_content = ' '.join(block_text(p) for p in paragraphs)
+        
+        # Poskusi najti naslov
+        title = ""
+        for selector in profile.title_selectors:
+            title_elem = soup.select_one(selector)
+            if title_elem:
+                title = title_elem.get_text(strip=True)
+                break
+        
+        if not title:
+            title = soup.title.string if soup.title else "Neznan naslov"
+        
+        return title, article_content
+    
+    def _select_content(self, soup: BeautifulSoup, selector: str) -> List[Tag]:
+        if is_paragraph_selector(selector):
+            return self._outermost(soup.select(selector))
+        # Vsebnik je le prvi zadetek; povezani in vgnezdeni članki niso del besedila
+        content = soup.select_one(selector)
+        return [content] if content else []
+    
+    @staticmethod
+    def _outermost(elements: List[Tag]) -> List[Tag]:
+        # Izpusti elemente znotraj že izbranega elementa, da se besedilo ne podvoji.
+        # Tag.__eq__ primerja vsebino, zato izbrane elemente hranimo po identiteti.
+        taken: List[Tag] = []
+        taken_ids = set()
+        for element in elements:
+            if not any(id(parent) in taken_ids for parent in element.parents):
+                taken.append(element)
+                taken_ids.add(id(element))
+        return taken
@@ -0,0 +1,79 @@
+import logging
+import re
+from pathlib import Path
+from typing import Any, Optional
+import torch
+from transformers import AutoModelForSequenceClassification, T5ForConditionalGeneration
+
+# eager: PyTorch fp32 (privzeto), int8: dinamična kvantizacija, onnx: ONNX Runtime
+# onnx zahteva optimum>=1.7 (from_pretrained(export=True)), transformers>=4.26 in onnxruntime>=1.11
+BACKENDS = ('eager', 'int8', 'onnx')
+
+logger = logging.getLogger(__name__)
+
+def load_sequence_classifier(model_name: str, backend: str = 'eager', device: Optional[torch.device] = None,
+                             dtype: Optional[str] = None, onnx_cache_dir: str = "data/onnx") -> Any:
+    """Naloži FinBERT (ali drug klasifikator) za izbrano izvajalno okolje."""
+    if backend == 'onnx':
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        return _load_onnx(ORTModelForSequenceClassification, model_name, 'sequence-classification', onnx_cache_dir)
+    
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_name,
+        torch_dtype=getattr(torch, dtype) if dtype else None
+    )
+    return _prepare_torch_model(model, backend, device)
+
+def load_seq2seq(model_name: str, backend: str = 'eager', device: Optional[torch.device] = None,
+                 dtype: Optional[str] = None, onnx_cache_dir: str = "data/onnx") -> Any:
+    """Naloži T5 (kodirnik in dekodirnik) za izbrano izvajalno okolje."""
+    if backend == 'onnx':
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        return _load_onnx(ORTModelForSeq2SeqLM, model_name, 'seq2seq-lm', onnx_cache_dir)
+    
+    model = T5ForConditionalGeneration.from_pretrained(
+        model_name,
+        torch_dtype=getattr(torch, dtype) if dtype else None
+    )
+    return _prepare_torch_model(model, backend, device)
+
+def model_size_mb(model: Any) -> float:
+    """Velikost uteži modela; za ONNX modele velikost izvoženih datotek."""
+    if isinstance(model, torch.nn.Module):
+        tensors = list(model.parameters()) + list(model.buffers())
+        size = sum(t.numel() * t.element_size() for t in tensors)
+        
+        # Kvantizirane uteži niso med parametri modela
+        for module in model.modules():
+            if hasattr(module, '_packed_params') and callable(getattr(module, 'weight', None)):
+                weight = module.weight()
+                size += weight.numel() * weight.element_size()
+        return size / 1024 ** 2
+    
+    model_dir = Path(getattr(model, 'model_save_dir', '') or '')
+    if model_dir.is_dir():
+        return sum(path.stat().st_size for path in model_dir.glob('*.onnx*')) / 1024 ** 2
+    return 0.0
+
+def _prepare_torch_model(model: torch.nn.Module, backend: str, device: Optional[torch.device]) -> torch.nn.Module:
+    if backend == 'int8':
+        if device is not None and device.type != 'cpu':
+            raise ValueError("Dinamična int8 kvantizacija je na voljo le na CPU")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend != 'eager':
+        raise ValueError(f"Neznano izvajalno okolje: {backend}")
+    
+    if device is not None:
+        model = model.to(device)
+    return model.eval()
+
+def _load_onnx(model_class: Any, model_name: str, task: str, onnx_cache_dir: str) -> Any:
+    # Izvoženi graf shranimo na disk in ga ob naslednjem zagonu le naložimo
+    export_dir = Path(onnx_cache_dir) / task / re.sub(r'[^\w.-]+', '_', model_name)
+    if export_dir.is_dir() and any(export_dir.glob('*.onnx')):
+        return model_class.from_pretrained(export_dir)
+    
+    logger.info(f"Izvažam {model_name} v ONNX ({export_dir})")
+    model = model_class.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
@@ -0,0 +1,116 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+from pydantic import BaseModel
+
+class KeywordMatch(BaseModel):
+    keyword: str
+    start: int
+    end: int
+
+def _fold(text: str) -> str:
+    # Pretvorba v male črke, ki ohrani dolžino (npr. 'İ' bi sicer postal dva znaka)
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(char.lower()[0] for char in text)
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+class KeywordMatcher:
+    """Aho-Corasick avtomat za iskanje vseh ključnih besed v enem prehodu čez besedilo.
+    
+    Zadetek velja le na mejah besed, zato "AMD" ne najde "AMDOCS". Meja se preverja
+    samo na robovih, ki so črka ali številka, tako da delujejo tudi "S&P 500" in "$AAPL".
+    """
+    
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        self.keywords: List[str] = list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Za vsako stanje: (indeks ključne besede, dolžina) vseh besed, ki se tu končajo
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        
+        for idx, keyword in enumerate(self.keywords):
+            state = 0
+            for char in self._normalize(keyword):
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((idx, len(keyword)))
+        
+        # Povezave ob neuspehu po plasteh (BFS); izhodi se podedujejo po povezavi
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Vsi zadetki (tudi prekrivajoči) v vrstnem redu konca zadetka."""
+        return [
+            KeywordMatch(keyword=self.keywords[idx], start=start, end=end)
+            for idx, start, end in self._scan(text, stop_at_first=False)
+        ]
+    
+    def matched_keywords(self, text: str) -> List[str]:
+        """Ključne besede, ki se pojavijo v besedilu, v vrstnem redu prvega zadetka."""
+        seen = dict.fromkeys(idx for idx, _, _ in self._scan(text, stop_at_first=False))
+        return [self.keywords[idx] for idx in seen]
+    
+    def contains_any(self, text: str) -> bool:
+        return any(True for _ in self._scan(text, stop_at_first=True))
+    
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else _fold(text)
+    
+    def _scan(self, text: str, stop_at_first: bool) -> Iterable[Tuple[int, int, int]]:
+        if not self.keywords or not text:
+            return
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        state = 0
+        for position, char in enumerate(self._normalize(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            
+            end = position + 1
+            for idx, keyword_length in output[state]:
+                start = end - keyword_length
+                if self._at_boundary(text, start, end, length):
+                    yield idx, start, end
+                    if stop_at_first:
+                        return
+    
+    @staticmethod
+    def _at_boundary(text: str, start: int, end: int, length: int) -> bool:
+        if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(text[end - 1]) and end < length and _is_word_char(text[end]):
+            return False
+        return True
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords: Tuple[str, ...], case_sensitive: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, case_sensitive)
+
+def get_matcher(keywords: Iterable[str], case_sensitive: bool = False) -> KeywordMatcher:
+    """Avtomat za dani nabor ključnih besed; enak nabor se zgradi le enkrat."""
+    normalized = tuple(sorted({k.strip() for k in keywords if k and k.strip()}))
+    return _cached_matcher(normalized, case_sensitive)
@@ -1,15 +1,22 @@
 import yaml
 import os
 from src.data_collection.news_api_client import NewsAPIClient
-from src.data_collection.news_scraper import FinancialNewsScraper
-from src.preprocessing.text_cleaner import TextCleaner
-from src.summarization.summarizer import NewsSummarizer
 from dotenv import load_dotenv
 import logging
-from src.sentiment.analyzer import FinancialSentimentAnalyzer
 from src.visualization.dashboard import SentimentDashboard
 from src.interface.gradio_app import FinancialNewsGUI
 from src.evaluation.evaluator import FinancialNewsEvaluator
+from src.models.model_registry import get_registry
+from src.monitoring.metrics import start_metrics_server
+from src.storage.timeseries_store import SentimentTimeSeriesStore
+from src.storage.results_writer import ResultsWriter
+from src.preprocessing.dedup import NearDuplicateIndex
+from src.preprocessing.keyword_matcher import get_matcher
+from src.pipeline.worker_pool import InferenceWorkerPool
+from src.pipeline.pipeline import (
+    EvaluationSink, clean_stage, keyword_stage, dedup_stage, summarize_stage, score_stage,
+    pooled_summarize_stage, pooled_score_stage, resolve_duplicates_stage
+)
 
 def load_config():
     with open('config/config.yaml', 'r') as f:
@@ -28,107 +35,187 @@ def main():
     setup_logging()
     logger = logging.getLogger(__name__)
     
+    # Metrike cevovoda v obliki Prometheus na /metrics
+    monitoring_config = config['monitoring']
+    if monitoring_config['enabled']:
+        start_metrics_server(monitoring_config['port'], monitoring_config['host'])
+    
     # Inicializacija komponent
-    news_api = NewsAPIClient(os.getenv('NEWS_API_KEY'))
-    scraper = FinancialNewsScraper()
-    cleaner = TextCleaner()
-    summarizer = NewsSummarizer(config['summarization']['model_name'])
+    news_api_config = config['data_collection']['news_api']
+    news_api = NewsAPIClient(
+        os.getenv('NEWS_API_KEY'),
+        watermark_path=news_api_config['watermark_path'],
+        max_workers=news_api_config['max_workers']
+    )
+    
+    # Register modelov si delita cevovod in grafični vmesnik
+    registry = get_registry(config)
+    cache = registry.cache
+    scraper = registry.scraper()
+    cleaner = registry.cleaner()
+    
+    # Indeks skoraj podvojenih člankov
+    dedup_config = config['deduplication']
+    dedup_index = None
+    if dedup_config['enabled']:
+        dedup_index = NearDuplicateIndex(
+            threshold=dedup_config['threshold'],
+            num_perm=dedup_config['num_perm'],
+            bands=dedup_config['bands'],
+            shingle_size=dedup_config['shingle_size'],
+            window_hours=dedup_config['window_hours'],
+            max_entries=dedup_config['max_entries']
+        )
+    
+    # Časovna vrsta sentimenta s povzetki za nadzorno ploščo
+    timeseries_config = config['storage']['timeseries']
+    timeseries = None
+    if timeseries_config['enabled']:
+        retention = dict(timeseries_config['retention_days'])
+        timeseries = SentimentTimeSeriesStore(
+            timeseries_config['path'],
+            batch_size=timeseries_config['batch_size'],
+            flush_interval=timeseries_config['flush_interval'],
+            raw_retention_days=retention.pop('raw'),
+            rollup_retention_days=retention
+        )
+    
+    # Rezultati v Parquet, razdeljeni po datumu in viru
+    results_config = config['storage']['results']
+    results_writer = None
+    if results_config['enabled']:
+        results_writer = ResultsWriter(
+            config['storage']['summaries'],
+            row_group_size=results_config['row_group_size'],
+            max_buffered_rows=results_config['max_buffered_rows']
+        )
+    
+    # T5 se naloži šele ob prvem dolgem članku
+    summary_router = registry.summary_router()
+    
+    # V načinu z bazenom procesov modele naložijo procesi, ne glavni proces
+    pool_config = config['worker_pool']
+    worker_pool = None
+    if pool_config['enabled']:
+        worker_pool = InferenceWorkerPool(
+            config,
+            num_workers=pool_config['num_workers'],
+            threads_per_worker=pool_config['threads_per_worker'],
+            max_inflight=pool_config['max_inflight'],
+            start_method=pool_config['start_method'],
+            registry=registry
+        )
     
     # Inicializacija novih komponent
-    sentiment_analyzer = FinancialSentimentAnalyzer(
-        config['sentiment_analysis']['model_name']
-    )
+    sentiment_analyzer = None if worker_pool else registry.sentiment_analyzer()
     dashboard = SentimentDashboard(
         config['visualization']['grafana']['host'],
-        config['visualization']['grafana']['port']
+        config['visualization']['grafana']['port'],
+        config['visualization']['grafana']['datasource'],
+        config['visualization']['grafana']['timeseries_datasource'] if timeseries else None
     )
     
     # Inicializacija evaluatorja
-    evaluator = FinancialNewsEvaluator()
+    evaluator = FinancialNewsEvaluator(
+        workers=config['evaluation']['workers'],
+        shard_size=config['evaluation']['shard_size'],
+        start_method=config['evaluation']['start_method']
+    )
     
     try:
-        # Pridobi novice iz API-ja
-        articles = news_api.fetch_financial_news(
-            sources=config['data_collection']['news_api']['sources'],
-            language=config['data_collection']['news_api']['language']
-        )
-        
-        all_results = []
-        for article in articles:
-            # Čiščenje besedila
-            cleaned_text = cleaner.clean_text(article.content)
-            
-            # Generiranje povzetka
-            summary = summarizer.summarize(
-                cleaned_text,
-                max_length=config['summarization']['max_length'],
-                min_length=config['summarization']['min_length']
+        try:
+            # Pridobi novice iz API-ja
+            articles = news_api.fetch_financial_news(
+                sources=news_api_config['sources'],
+                language=news_api_config['language'],
+                page_size=news_api_config['page_size'],
+                max_pages=news_api_config['max_pages']
             )
             
-            # Analiza sentimenta
-            sentiment_result = sentiment_analyzer.analyze_sentiment(summary)
-            
-            if sentiment_result:
-                logger.info(f"Članek: {article.title}")
-                logger.info(f"Povzetek: {summary}")
-                logger.info(f"Sentiment: {sentiment_result.sentiment} "
-                          f"(zaupanje: {sentiment_result.confidence:.2f})\n")
-                
-                all_results.append({
-                    'title': article.title,
-                    'summary': summary,
-                    'sentiment': sentiment_result.sentiment,
-                    'confidence': sentiment_result.confidence,
-                    'timestamp': article.published_at
-                })
-        
-        # Pripravi podatke za evalvacijo
-        original_texts = [article.content for article in articles]
-        generated_summaries = []
-        predicted_sentiments = []
-        confidence_scores = []
-        
-        for article in articles:
-            cleaned_text = cleaner.clean_text(article.content)
-            summary = summarizer.summarize(cleaned_text)
-            sentiment_result = sentiment_analyzer.analyze_sentiment(summary)
-            
-            generated_summaries.append(summary)
-            if sentiment_result:
-                predicted_sentiments.append(sentiment_result.sentiment)
-                confidence_scores.append(sentiment_result.confidence)
+            # Za demonstracijo uporabimo nekaj označenih podatkov
+            # V praksi bi morali imeti ročno označene podatke
+            demo_true_sentiments = ["positive"] * 3 + ["negative"] * 2 + ["neutral"] * 2
+            evaluation = EvaluationSink(evaluator, demo_true_sentiments)
             
-            # Analiza sentimenta
-            sentiment_result = sentiment_analyzer.analyze_sentiment(summary)
+            # Cevovod: pridobivanje -> čiščenje -> povzemanje -> sentiment -> ponor
+            summary_config = config['summarization']
+            records = clean_stage(
+                articles,
+                cleaner,
+                keep_sentences=summary_config['long_document']['enabled']
+                or summary_config['routing']['enabled']
+            )
+            keyword_config = config['keyword_filter']
+            if keyword_config['enabled']:
+                records = keyword_stage(
+                    records,
+                    get_matcher(keyword_config['keywords'], keyword_config['case_sensitive']),
+                    require_match=keyword_config['require_match']
+                )
+            if dedup_index:
+                records = dedup_stage(records, dedup_index)
+            if worker_pool:
+                records = pooled_summarize_stage(records, worker_pool, batch_size=summary_config['batch_size'])
+                records = pooled_score_stage(
+                    records,
+                    worker_pool,
+                    batch_size=config['sentiment_analysis']['batch_size']
+                )
+            else:
+                records = summarize_stage(records, summary_router, batch_size=summary_config['batch_size'])
+                records = score_stage(
+                    records,
+                    sentiment_analyzer,
+                    batch_size=config['sentiment_analysis']['batch_size'],
+                    sentence_splitter=registry.sentence_splitter()
+                )
+            if dedup_index:
+                records = resolve_duplicates_stage(records, dedup_index)
             
-            if sentiment_result:
-                logger.info(f"Članek: {article.title}")
-                logger.info(f"Povzetek: {summary}")
-                logger.info(f"Sentiment: {sentiment_result.sentiment} "
-                          f"(zaupanje: {sentiment_result.confidence:.2f})\n")
+            for record in records:
+                if record.duplicate_of:
+                    logger.info(f"Članek {record.title} je skoraj podvojen: {record.duplicate_of}")
+                
+                if record.keywords:
+                    logger.info(f"Članek {record.title}: ključne besede {', '.join(record.keywords)}")
                 
-                all_results.append({
-                    'title': article.title,
-                    'summary': summary,
-                    'sentiment': sentiment_result.sentiment,
-                    'confidence': sentiment_result.confidence,
-                    'timestamp': article.published_at
-                })
+                if record.num_chunks > 1:
+                    logger.info(f"Članek {record.title}: {record.num_chunks} delov, "
+                              f"{record.input_tokens} žetonov")
+                
+                if record.sentiment:
+                    logger.info(f"Članek: {record.title}")
+                    logger.info(f"Povzetek: {record.summary}")
+                    logger.info(f"Sentiment: {getattr(record.sentiment, 'intensity', record.sentiment.sentiment)} "
+                              f"(zaupanje: {record.sentiment.confidence:.2f})\n")
+                
+                if timeseries and record.sentiment:
+                    timeseries.add(
+                        record.published_at,
+                        record.source,
+                        record.sentiment.sentiment,
+                        record.sentiment.confidence,
+                        record.title,
+                        record.url
+                    )
+                
+                if results_writer:
+                    results_writer.add(record.dict())
+                
+                # Evalvacija porabi iste zapise
+                evaluation.consume(record)
+        finally:
+            # Zapiranje tudi ob napaki, da se vmesni podatki zapišejo in procesi ustavijo
+            if timeseries:
+                timeseries.flush()
+            if results_writer:
+                results_writer.close()
+            if worker_pool:
+                worker_pool.close()
         
         # Izvedi evalvacijo
-        summary_eval = evaluator.evaluate_summaries(
-            original_texts,
-            generated_summaries
-        )
-        
-        # Za demonstracijo uporabimo nekaj označenih podatkov
-        # V praksi bi morali imeti ročno označene podatke
-        demo_true_sentiments = ["positive"] * 3 + ["negative"] * 2 + ["neutral"] * 2
-        sentiment_eval = evaluator.evaluate_sentiment(
-            demo_true_sentiments[:len(predicted_sentiments)],
-            predicted_sentiments,
-            confidence_scores
-        )
+        summary_eval = evaluation.summary_evaluation()
+        sentiment_eval = evaluation.sentiment_evaluation()
         
         # Generiraj poročilo
         evaluation_report = evaluator.generate_evaluation_report(
@@ -145,6 +232,11 @@ def main():
         
         logger.info("Evalvacijsko poročilo:\n" + evaluation_report)
         
+        if cache:
+            logger.info(f"Predpomnilnik: {cache.stats()}")
+        logger.info(f"Stopnje povzemanja: {summary_router.stats()}")
+        logger.info(f"Naloženi modeli: {registry.stats()}")
+        
         # Ustvari dashboard
         dashboard_id = dashboard.create_sentiment_dashboard(
             config['visualization']['grafana']['dashboard_title']
@@ -154,7 +246,7 @@ def main():
             logger.info(f"Dashboard ustvarjen z ID: {dashboard_id}")
         
         # Zaženi Gradio vmesnik
-        gui = FinancialNewsGUI(config)
+        gui = FinancialNewsGUI(config, registry)
         gui.launch_interface()
         
     except Exception as e:
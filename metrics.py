@@ -0,0 +1,147 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, start_http_server
+
+# Lasten register, da metrike cevovoda ne mešamo s privzetimi metrikami procesa
+REGISTRY = CollectorRegistry()
+
+STAGE_LATENCY = Histogram(
+    'finaintel_stage_latency_seconds',
+    'Trajanje klica stopnje cevovoda (en paket ali en zapis)',
+    ['stage'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    registry=REGISTRY
+)
+STAGE_ITEMS = Counter(
+    'finaintel_stage_items_total',
+    'Število zapisov, ki so šli skozi stopnjo',
+    ['stage'],
+    registry=REGISTRY
+)
+BATCH_SIZE = Histogram(
+    'finaintel_batch_size',
+    'Velikost paketov po stopnjah',
+    ['stage'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+    registry=REGISTRY
+)
+TOKENS = Counter(
+    'finaintel_tokens_total',
+    'Vhodni in izhodni žetoni modelov',
+    ['stage', 'direction'],
+    registry=REGISTRY
+)
+CACHE_REQUESTS = Counter(
+    'finaintel_cache_requests_total',
+    'Poizvedbe v predpomnilnik rezultatov',
+    ['result'],
+    registry=REGISTRY
+)
+SUMMARY_TIERS = Counter(
+    'finaintel_summary_tier_total',
+    'Povzetki po stopnjah usmerjevalnika',
+    ['tier'],
+    registry=REGISTRY
+)
+SENTIMENT = Counter(
+    'finaintel_sentiment_total',
+    'Ocenjeni članki po oznaki sentimenta',
+    ['label'],
+    registry=REGISTRY
+)
+SENTIMENT_CONFIDENCE = Histogram(
+    'finaintel_sentiment_confidence',
+    'Zaupanje v napoved sentimenta',
+    ['label'],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+    registry=REGISTRY
+)
+REQUEST_LATENCY = Histogram(
+    'finaintel_request_latency_seconds',
+    'Zakasnitev posamezne zahteve v strežbi (čakanje v vrsti in obdelava)',
+    ['stage'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    registry=REGISTRY
+)
+BATCH_FILL = Histogram(
+    'finaintel_batch_fill_ratio',
+    'Zapolnjenost mikro paketov glede na največjo velikost paketa',
+    ['stage'],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+    registry=REGISTRY
+)
+QUEUE_DEPTH = Gauge(
+    'finaintel_queue_depth',
+    'Število zahtev, ki čakajo v vrsti strežbe',
+    ['stage'],
+    registry=REGISTRY
+)
+QUEUE_REJECTED = Counter(
+    'finaintel_queue_rejected_total',
+    'Zavrnjene zahteve zaradi polne vrste',
+    ['stage'],
+    registry=REGISTRY
+)
+
+# Števci, ki jih lahko prištejemo iz procesov bazena (histogrami se tam ne beležijo)
+COUNTERS = (STAGE_ITEMS, TOKENS, CACHE_REQUESTS, SUMMARY_TIERS, SENTIMENT, QUEUE_REJECTED)
+
+CounterValues = Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]
+
+def observe_stage(stage: str, seconds: float, batch_size: int = 0):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    if batch_size:
+        STAGE_ITEMS.labels(stage).inc(batch_size)
+        BATCH_SIZE.labels(stage).observe(batch_size)
+
+@contextmanager
+def stage_timer(stage: str, batch_size: int = 0) -> Iterator[None]:
+    """Izmeri blok kode kot en klic stopnje `stage` s `batch_size` zapisi."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, batch_size)
+
+def observe_tokens(stage: str, tokens_in: int, tokens_out: int = 0):
+    TOKENS.labels(stage, 'in').inc(tokens_in)
+    if tokens_out:
+        TOKENS.labels(stage, 'out').inc(tokens_out)
+
+def observe_sentiment(label: str, confidence: float):
+    SENTIMENT.labels(label).inc()
+    SENTIMENT_CONFIDENCE.labels(label).observe(confidence)
+
+def counter_values() -> CounterValues:
+    """Trenutne vrednosti števcev po (ime metrike, oznake)."""
+    values = {}
+    for family in REGISTRY.collect():
+        if family.type != 'counter':
+            continue
+        for sample in family.samples:
+            if sample.name.endswith('_total'):
+                values[(family.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return values
+
+def counter_deltas(before: CounterValues) -> CounterValues:
+    """Spremembe števcev od posnetka `before`."""
+    return {
+        key: value - before.get(key, 0.0)
+        for key, value in counter_values().items()
+        if value != before.get(key, 0.0)
+    }
+
+def merge_counter_deltas(deltas: CounterValues):
+    """Prišteje spremembe števcev iz drugega procesa števcem tega procesa."""
+    counters = {counter.describe()[0].name: counter for counter in COUNTERS}
+    for (name, labels), delta in deltas.items():
+        counters[name].labels(**dict(labels)).inc(delta)
+
+def metrics_text() -> str:
+    """Trenutne metrike v besedilni obliki Prometheus."""
+    return generate_latest(REGISTRY).decode('utf-8')
+
+def start_metrics_server(port: int = 8000, host: str = '0.0.0.0'):
+    """Zažene HTTP strežnik z metrikami na `/metrics` v ozadnji niti."""
+    start_http_server(port, addr=host, registry=REGISTRY)
@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import psutil
+from pydantic import BaseModel
+from src.data_collection.news_scraper import AsyncFinancialNewsScraper
+from src.preprocessing.text_cleaner import TextCleaner
+from src.summarization.summarizer import NewsSummarizer
+from src.summarization.summary_router import SummaryRouter
+from src.sentiment.analyzer import FinancialSentimentAnalyzer
+from src.storage.result_cache import ResultCache
+from src.models.inference_backends import model_size_mb
+
+class ModelLoadStats(BaseModel):
+    kind: str
+    model_name: str
+    backend: str
+    device: str
+    dtype: str
+    load_seconds: float
+    rss_delta_mb: float
+    parameter_mb: float
+
+class ModelRegistry:
+    """Register komponent, ki si jih delijo cevovod in grafični vmesnik.
+    
+    Vsak (model, naprava, dtype) se naloži šele ob prvi zahtevi, nato pa vsi
+    porabniki dobijo isto instanco.
+    """
+    
+    def __init__(self, config: Dict):
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self._instances: Dict[Tuple, Any] = {}
+        self._stats: Dict[Tuple, ModelLoadStats] = {}
+        self._lock = threading.RLock()
+        
+        cache_config = config['storage']['cache']
+        self.cache = None
+        if cache_config['enabled']:
+            self.cache = ResultCache(cache_config['path'], cache_config['max_size_mb'])
+    
+    def summarizer(self, model_name: Optional[str] = None, device: Optional[str] = None,
+                   dtype: Optional[str] = None) -> NewsSummarizer:
+        settings = self.config['summarization']
+        return self._get_model(
+            'summarizer',
+            NewsSummarizer,
+            model_name or settings['model_name'],
+            device or settings['device'],
+            dtype or settings['dtype'],
+            settings['backend'],
+            profile=settings['profile'],
+            seed=settings['seed']
+        )
+    
+    def sentiment_analyzer(self, model_name: Optional[str] = None, device: Optional[str] = None,
+                           dtype: Optional[str] = None) -> FinancialSentimentAnalyzer:
+        settings = self.config['sentiment_analysis']
+        return self._get_model(
+            'sentiment',
+            FinancialSentimentAnalyzer,
+            model_name or settings['model_name'],
+            device or settings['device'],
+            dtype or settings['dtype'],
+            settings['backend'],
+            intensity_thresholds=settings['threshold'],
+            sentence_batch_size=settings['sentence_level']['batch_size']
+        )
+    
+    def sentence_splitter(self) -> Optional[Callable[[str], List[str]]]:
+        """Delitev na povedi za sentiment po povedih; None, če je način izklopljen.
+        
+        Uporabi se le za povzetke brez znanih mej povedi (abstraktivni povzetki).
+        """
+        if not self.config['sentiment_analysis']['sentence_level']['enabled']:
+            return None
+        return self.cleaner().split_into_sentences
+    
+    def summary_router(self) -> SummaryRouter:
+        # Števci stopenj so skupni cevovodu in vmesniku
+        return self._get(('summary_router',), lambda: SummaryRouter(
+            self.summarizer,
+            self.config['summarization']
+        ))
+    
+    def cleaner(self) -> TextCleaner:
+        return self._get(('cleaner',), lambda: TextCleaner(self.config['preprocessing']['nltk_data']))
+    
+    def scraper(self) -> AsyncFinancialNewsScraper:
+        scraping = self.config['data_collection']['web_scraping']
+        return self._get(('scraper',), lambda: AsyncFinancialNewsScraper(
+            concurrency=scraping['concurrency'],
+            per_host_concurrency=scraping['per_host_concurrency'],
+            requests_per_second=scraping['requests_per_second'],
+            timeout=scraping['timeout'],
+            max_retries=scraping['max_retries']
+        ))
+    
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                f"{stats.kind}:{stats.model_name}@{stats.device}/{stats.dtype}/{stats.backend}": stats.dict()
+                for stats in self._stats.values()
+            }
+    
+    def _get(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = factory()
+            return self._instances[key]
+    
+    def _get_model(self, kind: str, factory: Callable, model_name: str,
+                   device: Optional[str], dtype: Optional[str], backend: str = 'eager',
+                   **options) -> Any:
+        # Vrednosti možnosti so lahko slovarji (npr. pragovi), zato ključ gradimo iz repr
+        key = (kind, model_name, device, dtype, backend) + tuple(
+            sorted((name, repr(value)) for name, value in options.items())
+        )
+        with self._lock:
+            if key in self._instances:
+                return self._instances[key]
+            
+            process = psutil.Process()
+            rss_before = process.memory_info().rss
+            start = time.perf_counter()
+            instance = factory(
+                model_name,
+                cache=self.cache,
+                device=device,
+                dtype=dtype,
+                backend=backend,
+                onnx_cache_dir=self.config['storage']['onnx_cache'],
+                **options
+            )
+            load_seconds = time.perf_counter() - start
+            
+            stats = ModelLoadStats(
+                kind=kind,
+                model_name=model_name,
+                backend=backend,
+                device=str(instance.device),
+                dtype=dtype or 'float32',
+                load_seconds=load_seconds,
+                rss_delta_mb=(process.memory_info().rss - rss_before) / 1024 ** 2,
+                parameter_mb=model_size_mb(instance.model)
+            )
+            self.logger.info(
+                f"Naložen model {model_name} ({kind}, {backend}) v {load_seconds:.1f} s, "
+                f"RSS +{stats.rss_delta_mb:.0f} MB"
+            )
+            
+            self._instances[key] = instance
+            self._stats[key] = stats
+            return instance
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry(config: Dict) -> ModelRegistry:
+    """Vrne register modelov za ta proces; ustvari ga ob prvem klicu."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(config)
+        return _registry
@@ -1,7 +1,13 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import newsapi
 from pydantic import BaseModel
 import logging
+from src.monitoring.metrics import observe_stage
 
 class NewsArticle(BaseModel):
     title: str
@@ -10,32 +16,170 @@ class NewsArticle(BaseModel):
     source: str
     published_at: str
 
+def _boundary(articles: List[NewsArticle], pick) -> Tuple[str, List[str]]:
+    # Čas najnovejšega (max) ali najstarejšega (min) članka in URL-ji s tem časom
+    published_at = pick(article.published_at for article in articles)
+    return published_at, sorted(article.url for article in articles if article.published_at == published_at)
+
 class NewsAPIClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, watermark_path: Optional[str] = None, max_workers: int = 4):
         self.client = newsapi.NewsApiClient(api_key=api_key)
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.watermark_path = Path(watermark_path) if watermark_path else None
+        self.watermarks = self._load_watermarks()
+        self._lock = threading.Lock()
     
-    def fetch_financial_news(self, sources: List[str], language: str = 'en') -> List[NewsArticle]:
+    def fetch_financial_news(self, sources: List[str], language: str = 'en',
+                             page_size: int = 100, max_pages: int = 5,
+                             incremental: bool = True) -> List[NewsArticle]:
+        """Pridobi novice vseh virov vzporedno, po straneh in brez podvojenih URL-jev.
+        
+        V inkrementalnem načinu se za vsak vir zahtevajo le članki, novejši od
+        zadnjega videnega (vodni žig), ki se po uspešnem branju shrani na disk.
+        Če branje vira ustavi `max_pages` ali napaka na kasnejši strani, se shrani
+        točka nadaljevanja in naslednji klic najprej prebere preostale starejše članke.
+        Neveljavni članki (npr. brez vsebine) se preskočijo.
+        """
         try:
-            response = self.client.get_everything(
-                sources=','.join(sources),
-                language=language,
-                sort_by='publishedAt'
-            )
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources)))) as executor:
+                per_source = list(executor.map(
+                    lambda source: self._fetch_source(source, language, page_size, max_pages, incremental),
+                    sources
+                ))
             
+            # Odstrani podvojene članke po URL-ju
+            seen_urls = set()
             articles = []
-            for article in response['articles']:
-                articles.append(
-                    NewsArticle(
-                        title=article['title'],
-                        content=article['content'],
-                        url=article['url'],
-                        source=article['source']['name'],
-                        published_at=article['publishedAt']
-                    )
-                )
+            for source_articles in per_source:
+                for article in source_articles:
+                    if article.url in seen_urls:
+                        continue
+                    seen_urls.add(article.url)
+                    articles.append(article)
+            
+            if incremental:
+                self._save_watermarks()
             return articles
             
         except Exception as e:
             self.logger.error(f"Napaka pri pridobivanju novic: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+    
+    def _fetch_source(self, source: str, language: str, page_size: int,
+                      max_pages: int, incremental: bool) -> List[NewsArticle]:
+        watermark = self.watermarks.get(source, {}) if incremental else {}
+        since = watermark.get('published_at')
+        seen_at_watermark = set(watermark.get('urls', []))
+        resume = watermark.get('resume')
+        until = resume['to'] if resume else None
+        seen_at_resume = set(resume['urls']) if resume else set()
+        
+        articles = []
+        exhausted = False
+        try:
+            for page in range(1, max_pages + 1):
+                params = {
+                    'sources': source,
+                    'language': language,
+                    'sort_by': 'publishedAt',
+                    'page': page,
+                    'page_size': page_size
+                }
+                if since:
+                    params['from_param'] = since
+                if until:
+                    params['to'] = until
+                start = time.perf_counter()
+                response = self.client.get_everything(**params)
+                observe_stage('fetch', time.perf_counter() - start, len(response['articles']))
+                
+                for item in response['articles']:
+                    try:
+                        article = NewsArticle(
+                            title=item['title'],
+                            content=item['content'],
+                            url=item['url'],
+                            source=item['source']['name'],
+                            published_at=item['publishedAt']
+                        )
+                    except Exception as e:
+                        self.logger.warning(f"Preskočen neveljaven članek vira {source}: {str(e)}")
+                        continue
+                    # `from` je vključujoč, zato izpustimo že videne članke na meji
+                    if since and (article.published_at < since or
+                                  (article.published_at == since and article.url in seen_at_watermark)):
+                        continue
+                    # Enako za `to` pri nadaljevanju prekinjenega branja
+                    if until and (article.published_at > until or
+                                  (article.published_at == until and article.url in seen_at_resume)):
+                        continue
+                    articles.append(article)
+                
+                if len(response['articles']) < page_size or page * page_size >= response['totalResults']:
+                    exhausted = True
+                    break
+            
+        except Exception as e:
+            # Za že prebrane strani se shrani točka nadaljevanja, preostale se preberejo ob naslednjem klicu
+            self.logger.error(f"Napaka pri pridobivanju novic vira {source}: {str(e)}")
+            exhausted = False
+        
+        if incremental and (articles or resume):
+            self._advance_watermark(source, articles, exhausted)
+        return articles
+    
+    def _advance_watermark(self, source: str, articles: List[NewsArticle], exhausted: bool):
+        """Premakne vodni žig le, ko so prebrane vse strani od prejšnjega žiga naprej.
+        
+        Sicer shrani točko nadaljevanja: najstarejši prebrani čas (`to`) in najnovejši
+        čas, na katerega se žig premakne, ko je preostanek prebran.
+        """
+        with self._lock:
+            current = self.watermarks.get(source, {})
+            resume = current.get('resume')
+            # Najnovejši videni članki; pri nadaljevanju so že zabeleženi v točki nadaljevanja
+            if resume:
+                latest, latest_urls = resume['latest'], resume['latest_urls']
+            else:
+                latest, latest_urls = _boundary(articles, max)
+            
+            if exhausted:
+                if current.get('published_at') == latest:
+                    latest_urls = sorted(set(current.get('urls', [])) | set(latest_urls))
+                elif current.get('published_at', '') > latest:
+                    return
+                self.watermarks[source] = {'published_at': latest, 'urls': latest_urls}
+                return
+            
+            if not articles:
+                return
+            oldest, oldest_urls = _boundary(articles, min)
+            if resume and resume['to'] == oldest:
+                oldest_urls = sorted(set(resume['urls']) | set(oldest_urls))
+            self.watermarks[source] = {
+                **current,
+                'resume': {'to': oldest, 'urls': oldest_urls, 'latest': latest, 'latest_urls': latest_urls}
+            }
+    
+    def _load_watermarks(self) -> Dict[str, Dict]:
+        if not self.watermark_path or not self.watermark_path.exists():
+            return {}
+        try:
+            with open(self.watermark_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Napaka pri branju vodnih žigov: {str(e)}")
+            return {}
+    
+    def _save_watermarks(self):
+        if not self.watermark_path:
+            return
+        try:
+            self.watermark_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.watermark_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self.watermarks, f, indent=2)
+            tmp_path.replace(self.watermark_path)
+        except Exception as e:
+            self.logger.error(f"Napaka pri shranjevanju vodnih žigov: {str(e)}")
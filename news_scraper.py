@@ -1,9 +1,14 @@
 from bs4 import BeautifulSoup
 import requests
-from typing import List, Dict
+import aiohttp
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import logging
 from pydantic import BaseModel
 from urllib.parse import urlparse
+from src.data_collection.html_extractor import HtmlExtractor
 
 class ScrapedArticle(BaseModel):
     title: str
@@ -12,15 +17,19 @@ class ScrapedArticle(BaseModel):
     source: str
 
 class FinancialNewsScraper:
-    def __init__(self):
+    def __init__(self, timeout: float = 15.0):
         self.logger = logging.getLogger(__name__)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.timeout = timeout
+        self.extractor = HtmlExtractor()
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
     
     def scrape_bloomberg(self, url: str) -> List[ScrapedArticle]:
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, timeout=self.timeout)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             articles = []
@@ -46,54 +55,160 @@ class FinancialNewsScraper:
     def scrape_url(self, url: str) -> List[ScrapedArticle]:
         """Scrape any financial news URL."""
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Poskusi najti glavni članek
-            article_content = ""
-            
-            # Poskusi različne pogoste selektorje za vsebino članka
-            content_selectors = [
-                'article',
-                '.article-content',
-                '.article-body',
-                '#article-body',
-                '.story-content'
-            ]
-            
-            for selector in content_selectors:
-                content = soup.select_one(selector)
-                if content:
-                    # Odstrani nepotrebne elemente
-                    for tag in content.find_all(['script', 'style']):
-                        tag.decompose()
-                    article_content = content.get_text(strip=True)
-                    break
-            
-            if not article_content:
-                # Če ne najdemo specifičnega selektorja, vzemi vse odstavke
-                paragraphs = soup.find_all('p')
-                article_content = ' '.join(p.get_text(strip=True) for p in paragraphs)
-            
-            # Poskusi najti naslov
-            title = ""
-            title_selectors = ['h1', '.article-title', '.headline']
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    break
-            
-            if not title:
-                title = soup.title.string if soup.title else "Neznan naslov"
-            
-            return [ScrapedArticle(
-                title=title,
-                content=article_content,
-                url=url,
-                source=urlparse(url).netloc
-            )]
+            response = self.session.get(url, timeout=self.timeout)
+            return self._parse_article(response.text, url)
             
         except Exception as e:
             self.logger.error(f"Napaka pri strganju URL-ja {url}: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+    
+    def _parse_article(self, html: str, url: str) -> List[ScrapedArticle]:
+        source = urlparse(url).netloc
+        title, article_content = self.extractor.extract(html, source)
+        
+        return [ScrapedArticle(
+            title=title,
+            content=article_content,
+            url=url,
+            source=source
+        )]
+
+class _HostLimiter:
+    """Omejitev sočasnosti in hitrosti zahtev za en strežnik."""
+    
+    def __init__(self, concurrency: int, requests_per_second: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class AsyncFinancialNewsScraper(FinancialNewsScraper):
+    """Sočasno strganje več URL-jev prek skupnega bazena povezav.
+    
+    Zahteve na isti strežnik so omejene po številu in hitrosti. Ob ponovnem
+    strganju se pošlje pogojni GET (ETag/Last-Modified), nespremenjene strani
+    pa se vrnejo iz zadnjega rezultata. Ta predpomnilnik je zaščiten z zaklepom,
+    ker lahko scrape_urls hkrati kliče več niti, vsaka s svojo zanko dogodkov.
+    """
+    
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    def __init__(self, concurrency: int = 20, per_host_concurrency: int = 4,
+                 requests_per_second: float = 2.0, timeout: float = 15.0,
+                 max_retries: int = 3, backoff: float = 0.5,
+                 max_conditional_entries: int = 10000):
+        super().__init__(timeout=timeout)
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_conditional_entries = max_conditional_entries
+        self._conditional: "OrderedDict[str, Tuple[Optional[str], Optional[str], List[ScrapedArticle]]]" = OrderedDict()
+        self._conditional_lock = threading.Lock()
+    
+    def scrape_urls(self, urls: List[str]) -> Dict[str, List[ScrapedArticle]]:
+        return asyncio.run(self.scrape_urls_async(urls))
+    
+    async def scrape_urls_async(self, urls: List[str]) -> Dict[str, List[ScrapedArticle]]:
+        results = {}
+        async for url, articles in self.iter_scrape(urls):
+            results[url] = articles
+        return {url: results.get(url, []) for url in urls}
+    
+    async def iter_scrape(self, urls: List[str]) -> AsyncIterator[Tuple[str, List[ScrapedArticle]]]:
+        """Vrača pare (url, članki) v vrstnem redu, kot se strganje zaključi."""
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host_concurrency
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        limiters: Dict[str, _HostLimiter] = {}
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=self.headers) as session:
+            async def scrape(url: str) -> Tuple[str, List[ScrapedArticle]]:
+                host = urlparse(url).netloc
+                if host not in limiters:
+                    limiters[host] = _HostLimiter(self.per_host_concurrency, self.requests_per_second)
+                return url, await self._fetch(session, url, limiters[host])
+            
+            tasks = [asyncio.ensure_future(scrape(url)) for url in dict.fromkeys(urls)]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    async def _fetch(self, session: aiohttp.ClientSession, url: str,
+                     limiter: _HostLimiter) -> List[ScrapedArticle]:
+        headers = {}
+        with self._conditional_lock:
+            cached = self._conditional.get(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with limiter.semaphore:
+                    await limiter.wait()
+                    async with session.get(url, headers=headers) as response:
+                        if response.status == 304 and cached:
+                            with self._conditional_lock:
+                                # Vnos je lahko medtem izrinila druga nit
+                                if url in self._conditional:
+                                    self._conditional.move_to_end(url)
+                            return cached[2]
+                        if response.status in self.RETRY_STATUSES:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info,
+                                response.history,
+                                status=response.status
+                            )
+                        if response.status >= 400:
+                            self.logger.error(f"Napaka pri strganju URL-ja {url}: HTTP {response.status}")
+                            return []
+                        
+                        html = await response.text()
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
+                
+                # Razčlenjevanje ne sme blokirati zanke dogodkov
+                loop = asyncio.get_running_loop()
+                articles = await loop.run_in_executor(None, self._parse_article, html, url)
+                self._remember(url, etag, last_modified, articles)
+                return articles
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    self.logger.error(f"Napaka pri strganju URL-ja {url}: {str(e)}")
+                    return []
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+            except Exception as e:
+                self.logger.error(f"Napaka pri strganju URL-ja {url}: {str(e)}")
+                return []
+        return []
+    
+    def _remember(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                  articles: List[ScrapedArticle]):
+        if not etag and not last_modified:
+            return
+        with self._conditional_lock:
+            self._conditional[url] = (etag, last_modified, articles)
+            self._conditional.move_to_end(url)
+            while len(self._conditional) > self.max_conditional_entries:
+                self._conditional.popitem(last=False)
@@ -0,0 +1,212 @@
+import time
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+from pydantic import BaseModel
+from src.data_collection.news_api_client import NewsArticle
+from src.preprocessing.text_cleaner import TextCleaner
+from src.preprocessing.dedup import NearDuplicateIndex
+from src.preprocessing.keyword_matcher import KeywordMatcher
+from src.summarization.summary_router import SummaryRouter
+from src.sentiment.analyzer import FinancialSentimentAnalyzer, SentimentResult
+from src.evaluation.evaluator import FinancialNewsEvaluator, SentimentAccumulator
+from src.pipeline.worker_pool import InferenceWorkerPool
+from src.monitoring.metrics import observe_sentiment, observe_stage, stage_timer
+
+class ArticleRecord(BaseModel):
+    title: str
+    content: str
+    url: str
+    source: str
+    published_at: str
+    cleaned_text: str = ""
+    sentences: List[str] = []
+    keywords: List[str] = []
+    summary: str = ""
+    summary_sentences: List[str] = []
+    summary_tier: str = ""
+    num_chunks: int = 0
+    input_tokens: int = 0
+    sentiment: Optional[SentimentResult] = None
+    duplicate_of: Optional[str] = None
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def clean_stage(articles: Iterable[NewsArticle], cleaner: TextCleaner,
+                keep_sentences: bool = False) -> Iterator[ArticleRecord]:
+    """Očisti besedilo vsakega članka; po potrebi ohrani meje povedi."""
+    for article in articles:
+        with stage_timer('clean', 1):
+            record = ArticleRecord(**article.dict())
+            if keep_sentences:
+                record.sentences = cleaner.clean_sentences(article.content)
+                record.cleaned_text = ' '.join(record.sentences)
+            else:
+                record.cleaned_text = cleaner.clean_text(article.content)
+        yield record
+
+def keyword_stage(records: Iterable[ArticleRecord], matcher: KeywordMatcher,
+                  require_match: bool = False) -> Iterator[ArticleRecord]:
+    """Označi zapise z ujemajočimi se ključnimi besedami; po potrebi izpusti ostale."""
+    for record in records:
+        with stage_timer('keywords', 1):
+            record.keywords = matcher.matched_keywords(f"{record.title}\n{record.content}")
+        if record.keywords or not require_match:
+            yield record
+
+def dedup_stage(records: Iterable[ArticleRecord], index: NearDuplicateIndex) -> Iterator[ArticleRecord]:
+    """Označi skoraj podvojene članke s povezavo na kanonični članek."""
+    for record in records:
+        with stage_timer('dedup', 1):
+            record.duplicate_of = index.check(record.url, record.cleaned_text)
+        yield record
+
+def summarize_stage(records: Iterable[ArticleRecord], router: SummaryRouter,
+                    batch_size: int = 8) -> Iterator[ArticleRecord]:
+    """Povzame zapise v paketih; usmerjevalnik izbere stopnjo povzemanja za vsak zapis."""
+    for records_batch in batched(records, batch_size):
+        # Podvojeni članki prevzamejo povzetek kanoničnega članka
+        batch = [record for record in records_batch if not record.duplicate_of]
+        if batch:
+            with stage_timer('summarize', len(batch)):
+                routed = router.summarize_batch(
+                    [record.cleaned_text for record in batch],
+                    [record.sentences for record in batch]
+                )
+            for record, result in zip(batch, routed):
+                record.summary = result.summary
+                record.summary_sentences = result.sentences
+                record.summary_tier = result.tier
+                record.num_chunks = result.num_chunks
+                record.input_tokens = result.input_tokens
+        yield from records_batch
+
+def score_stage(records: Iterable[ArticleRecord], analyzer: FinancialSentimentAnalyzer,
+                batch_size: int = 16,
+                sentence_splitter: Optional[Callable[[str], List[str]]] = None) -> Iterator[ArticleRecord]:
+    """Oceni sentiment povzetkov v paketih; z `sentence_splitter` po povedih.
+    
+    Povedi, ki jih vrne usmerjevalnik povzetkov, imajo prednost pred ponovno delitvijo.
+    """
+    for records_batch in batched(records, batch_size):
+        batch = [record for record in records_batch if not record.duplicate_of]
+        with stage_timer('score', len(batch)):
+            results = analyzer.analyze_batch(
+                [record.summary for record in batch],
+                batch_size=batch_size,
+                sentence_splitter=sentence_splitter,
+                sentences=[record.summary_sentences for record in batch]
+            )
+        for record, result in zip(batch, results):
+            record.sentiment = result
+            if result:
+                observe_sentiment(result.sentiment, result.confidence)
+        yield from records_batch
+
+def pooled_summarize_stage(records: Iterable[ArticleRecord], pool: InferenceWorkerPool,
+                           batch_size: int = 8) -> Iterator[ArticleRecord]:
+    """Kot summarize_stage, le da paketi tečejo vzporedno v procesih bazena."""
+    pending = deque()
+    
+    def batches():
+        for records_batch in batched(records, batch_size):
+            batch = [record for record in records_batch if not record.duplicate_of]
+            pending.append((records_batch, batch))
+            yield [record.cleaned_text for record in batch], [record.sentences for record in batch]
+    
+    start = time.perf_counter()
+    for routed in pool.summarize_batches(batches()):
+        records_batch, batch = pending.popleft()
+        observe_stage('summarize', time.perf_counter() - start, len(batch))
+        for record, result in zip(batch, routed):
+            record.summary = result.summary
+            record.summary_sentences = result.sentences
+            record.summary_tier = result.tier
+            record.num_chunks = result.num_chunks
+            record.input_tokens = result.input_tokens
+        yield from records_batch
+        start = time.perf_counter()
+
+def pooled_score_stage(records: Iterable[ArticleRecord], pool: InferenceWorkerPool,
+                       batch_size: int = 16) -> Iterator[ArticleRecord]:
+    """Kot score_stage, le da paketi tečejo vzporedno v procesih bazena."""
+    pending = deque()
+    
+    def batches():
+        for records_batch in batched(records, batch_size):
+            batch = [record for record in records_batch if not record.duplicate_of]
+            pending.append((records_batch, batch))
+            yield [record.summary for record in batch], [record.summary_sentences for record in batch]
+    
+    start = time.perf_counter()
+    for results in pool.score_batches(batches()):
+        records_batch, batch = pending.popleft()
+        observe_stage('score', time.perf_counter() - start, len(batch))
+        for record, result in zip(batch, results):
+            record.sentiment = result
+            if result:
+                observe_sentiment(result.sentiment, result.confidence)
+        yield from records_batch
+        start = time.perf_counter()
+
+def resolve_duplicates_stage(records: Iterable[ArticleRecord],
+                             index: NearDuplicateIndex) -> Iterator[ArticleRecord]:
+    """Kanonične rezultate shrani v indeks in jih kopira v podvojene članke."""
+    for record in records:
+        if record.duplicate_of:
+            canonical = index.get_result(record.duplicate_of)
+            if canonical:
+                record.summary, record.sentiment = canonical
+                if record.sentiment:
+                    observe_sentiment(record.sentiment.sentiment, record.sentiment.confidence)
+        else:
+            index.set_result(record.url, (record.summary, record.sentiment))
+        yield record
+
+class EvaluationSink:
+    """Sproti zbira evalvacijo zapisov, ki pridejo skozi cevovod.
+    
+    Pari besedilo-povzetek se zbirajo v dele, ki jih ROUGE oceni skupina procesov
+    evalvatorja (`workers`, `shard_size`); metrike sentimenta zbira SentimentAccumulator.
+    """
+    
+    def __init__(self, evaluator: FinancialNewsEvaluator, true_sentiments: List[str]):
+        self.evaluator = evaluator
+        self.true_sentiments = true_sentiments
+        self.summaries = evaluator.streaming_summaries()
+        self.num_summaries = 0
+        self.num_labeled = 0
+        self.sentiment_metrics = SentimentAccumulator()
+        self.logger = logging.getLogger(__name__)
+    
+    def consume(self, record: ArticleRecord):
+        with stage_timer('evaluate', 1):
+            self._consume(record)
+    
+    def _consume(self, record: ArticleRecord):
+        self.summaries.add(record.content, record.summary)
+        self.num_summaries += 1
+        
+        if record.sentiment and self.num_labeled < len(self.true_sentiments):
+            self.sentiment_metrics.update(
+                self.true_sentiments[self.num_labeled],
+                record.sentiment.sentiment,
+                record.sentiment.confidence
+            )
+            self.num_labeled += 1
+    
+    def summary_evaluation(self) -> Dict:
+        if not self.num_summaries:
+            self.summaries.close()
+            return {}
+        return {'average_scores': self.summaries.results()['average_scores']}
+    
+    def sentiment_evaluation(self) -> Dict:
+        return self.sentiment_metrics.report()
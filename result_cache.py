@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from src.storage.sqlite_connection import WalConnection
+from src.monitoring.metrics import CACHE_REQUESTS
+
+class ResultCache:
+    """Trajni predpomnilnik rezultatov modelov, naslovljen z vsebino.
+    
+    Zapisi so v SQLite bazi (WAL), zato jo lahko hkrati uporablja več procesov.
+    Ko velikost preseže `max_size_mb`, se odstranijo najdlje neuporabljeni zapisi.
+    Časi dostopa ob zadetkih se zbirajo v pomnilniku in zapišejo skupaj ob
+    občasnem pregledu velikosti, da branje ne zaklepa baze za pisanje.
+    """
+    
+    def __init__(self, path: str = "data/cache/results.sqlite", max_size_mb: int = 512):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+        self.evict_check_interval = 100
+        self.max_pending_access = 10000
+        self._puts_since_check = 0
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._db = WalConnection(self.path)
+        
+        with self._lock:
+            self._db.get().execute(
+                """CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._db.get().execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)"
+            )
+    
+    @staticmethod
+    def make_key(text: str, model_name: str, params: Dict) -> str:
+        payload = json.dumps([text, model_name, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with self._lock:
+                conn = self._db.get()
+                row = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    CACHE_REQUESTS.labels('miss').inc()
+                    return None
+                self._accessed[key] = time.time()
+                self.hits += 1
+                if len(self._accessed) >= self.max_pending_access:
+                    self._flush_access(conn)
+            CACHE_REQUESTS.labels('hit').inc()
+            return json.loads(row[0])
+            
+        except Exception as e:
+            self.logger.error(f"Napaka pri branju iz predpomnilnika: {str(e)}")
+            self.misses += 1
+            CACHE_REQUESTS.labels('miss').inc()
+            return None
+    
+    def put(self, key: str, value: Any):
+        try:
+            data = json.dumps(value, ensure_ascii=False)
+            with self._lock:
+                conn = self._db.get()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data.encode('utf-8')), time.time())
+                )
+                # Skupno velikost preverjamo le občasno, ker zahteva pregled tabele
+                self._puts_since_check += 1
+                if self._puts_since_check >= self.evict_check_interval:
+                    self._puts_since_check = 0
+                    self._flush_access(conn)
+                    self._evict(conn)
+                
+        except Exception as e:
+            self.logger.error(f"Napaka pri pisanju v predpomnilnik: {str(e)}")
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._db.get().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size
+        }
+    
+    def merge_stats(self, hits: int, misses: int):
+        """Prišteje zadetke in zgrešitve iz drugega procesa z istim predpomnilnikom."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+    
+    def _flush_access(self, conn: sqlite3.Connection):
+        if not self._accessed:
+            return
+        accessed, self._accessed = self._accessed, {}
+        # Vse posodobitve v eni transakciji; novejšega času iz put ne prepišemo
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "UPDATE cache SET last_access = MAX(last_access, ?) WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in accessed.items()]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            self.logger.error(f"Napaka pri zapisovanju časov dostopa: {str(e)}")
+    
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        
+        # Odstrani najstarejše zapise, dokler ne pademo pod 90 % omejitve
+        target = int(self.max_size_bytes * 0.9)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = 0
+            for key, size in conn.execute(
+                "SELECT key, size FROM cache ORDER BY last_access"
+            ).fetchall():
+                if total - removed <= target:
+                    break
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                removed += size
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
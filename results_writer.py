@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+SENTIMENT_LABELS = ['positive', 'negative', 'neutral']
+
+# Vektor ocen iz SentimentResult.scores je shranjen kot stolpci fiksne širine
+SCORE_COLUMNS = [f"score_{label}" for label in SENTIMENT_LABELS]
+
+RESULTS_SCHEMA = pa.schema(
+    [
+        ('url', pa.string()),
+        ('title', pa.string()),
+        ('published_at', pa.timestamp('us', tz='UTC')),
+        ('summary', pa.string()),
+        ('summary_tier', pa.string()),
+        ('keywords', pa.list_(pa.string())),
+        ('num_chunks', pa.int32()),
+        ('input_tokens', pa.int32()),
+        ('duplicate_of', pa.string()),
+        ('sentiment', pa.string()),
+        ('confidence', pa.float32()),
+        ('intensity', pa.string()),
+        ('mixed', pa.bool_())
+    ] + [(column, pa.float32()) for column in SCORE_COLUMNS]
+)
+
+# Particije sta datum objave in vir (hive: date=.../source=...)
+PARTITIONING = ds.partitioning(
+    pa.schema([('date', pa.string()), ('source', pa.string())]),
+    flavor='hive'
+)
+
+class ResultsWriter:
+    """Pretočno zapisovanje povzetkov in sentimenta v Parquet, razdeljeno po datumu in viru.
+    
+    Vrstice se zbirajo po particijah. Ko particija doseže `row_group_size` vrstic,
+    se zapiše kot ena skupina vrstic; ko vseh vrstic v pomnilniku preseže
+    `max_buffered_rows`, se izpiše največja particija.
+    """
+    
+    def __init__(self, root: str = "data/summaries", row_group_size: int = 10000,
+                 max_buffered_rows: int = 50000, max_open_files: int = 32,
+                 compression: str = 'zstd'):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self.max_open_files = max_open_files
+        self.compression = compression
+        self.rows_written = 0
+        self.logger = logging.getLogger(__name__)
+        self._buffers: Dict[Tuple[str, str], List[Dict]] = {}
+        self._buffered_rows = 0
+        self._writers: 'OrderedDict[Tuple[str, str], pq.ParquetWriter]' = OrderedDict()
+        self._file_seq = 0
+        self._lock = threading.Lock()
+    
+    def add(self, record: Dict):
+        """Doda zapis (npr. `ArticleRecord.dict()`); odvečna polja se prezrejo."""
+        try:
+            row, partition = self._to_row(record)
+        except Exception as e:
+            self.logger.error(f"Napaka pri pripravi zapisa za Parquet: {str(e)}")
+            return
+        
+        with self._lock:
+            buffer = self._buffers.setdefault(partition, [])
+            buffer.append(row)
+            self._buffered_rows += 1
+            if len(buffer) >= self.row_group_size:
+                self._flush_partition(partition)
+            elif self._buffered_rows >= self.max_buffered_rows:
+                largest = max(self._buffers, key=lambda key: len(self._buffers[key]))
+                self._flush_partition(largest)
+    
+    def flush(self):
+        with self._lock:
+            for partition in list(self._buffers):
+                self._flush_partition(partition)
+    
+    def close(self):
+        with self._lock:
+            for partition in list(self._buffers):
+                self._flush_partition(partition)
+            while self._writers:
+                _, writer = self._writers.popitem(last=False)
+                writer.close()
+    
+    def _flush_partition(self, partition: Tuple[str, str]):
+        rows = self._buffers.pop(partition, [])
+        if not rows:
+            return
+        self._buffered_rows -= len(rows)
+        try:
+            table = pa.Table.from_pylist(rows, schema=RESULTS_SCHEMA)
+            self._writer(partition).write_table(table, row_group_size=self.row_group_size)
+            self.rows_written += len(rows)
+        except Exception as e:
+            self.logger.error(f"Napaka pri pisanju Parquet particije {partition}: {str(e)}")
+    
+    def _writer(self, partition: Tuple[str, str]) -> pq.ParquetWriter:
+        writer = self._writers.get(partition)
+        if writer is not None:
+            self._writers.move_to_end(partition)
+            return writer
+        
+        # Omejimo število odprtih datotek; zaprta particija ob naslednjem pisanju dobi novo datoteko
+        if len(self._writers) >= self.max_open_files:
+            _, oldest = self._writers.popitem(last=False)
+            oldest.close()
+        
+        date, source = partition
+        directory = self.root / f"date={date}" / f"source={quote(source, safe='')}"
+        directory.mkdir(parents=True, exist_ok=True)
+        self._file_seq += 1
+        path = directory / f"part-{int(time.time() * 1000)}-{self._file_seq:05d}.parquet"
+        writer = pq.ParquetWriter(str(path), RESULTS_SCHEMA, compression=self.compression)
+        self._writers[partition] = writer
+        return writer
+    
+    @staticmethod
+    def _to_row(record: Dict) -> Tuple[Dict, Tuple[str, str]]:
+        published_at = _parse_datetime(record.get('published_at'))
+        sentiment = record.get('sentiment') or {}
+        scores = sentiment.get('scores') or {}
+        row = {
+            'url': record.get('url'),
+            'title': record.get('title'),
+            'published_at': published_at,
+            'summary': record.get('summary'),
+            'summary_tier': record.get('summary_tier') or None,
+            'keywords': record.get('keywords') or [],
+            'num_chunks': record.get('num_chunks', 0),
+            'input_tokens': record.get('input_tokens', 0),
+            'duplicate_of': record.get('duplicate_of'),
+            'sentiment': sentiment.get('sentiment'),
+            'confidence': sentiment.get('confidence'),
+            'intensity': sentiment.get('intensity'),
+            'mixed': sentiment.get('mixed')
+        }
+        for label, column in zip(SENTIMENT_LABELS, SCORE_COLUMNS):
+            row[column] = scores.get(label)
+        return row, (published_at.strftime('%Y-%m-%d'), record.get('source') or 'unknown')
+
+class ResultsReader:
+    """Branje zgodovine rezultatov s pomnilniško preslikavo in filtri po particijah.
+    
+    Filtri po datumu in viru izločijo cele mape, filtri po sentimentu in zaupanju
+    pa se izvedejo med branjem; celotna zgodovina se nikoli ne naloži v pandas.
+    """
+    
+    def __init__(self, root: str = "data/summaries"):
+        self.root = Path(root)
+        self.dataset = ds.dataset(
+            str(self.root),
+            format='parquet',
+            partitioning=PARTITIONING,
+            filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+    
+    def filter_expression(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                          sources: Optional[List[str]] = None, sentiment: Optional[str] = None,
+                          min_confidence: Optional[float] = None) -> Optional[ds.Expression]:
+        """Izraz za filtriranje; datuma sta vključujoča v obliki YYYY-MM-DD."""
+        conditions = []
+        if start_date:
+            conditions.append(ds.field('date') >= start_date)
+        if end_date:
+            conditions.append(ds.field('date') <= end_date)
+        if sources:
+            conditions.append(ds.field('source').isin(sources))
+        if sentiment:
+            conditions.append(ds.field('sentiment') == sentiment)
+        if min_confidence is not None:
+            conditions.append(ds.field('confidence') >= min_confidence)
+        
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+    
+    def read(self, columns: Optional[List[str]] = None, **filters) -> pa.Table:
+        return self.dataset.to_table(columns=columns, filter=self.filter_expression(**filters))
+    
+    def iter_batches(self, columns: Optional[List[str]] = None, batch_size: int = 65536,
+                     **filters) -> Iterator[pa.RecordBatch]:
+        yield from self.dataset.to_batches(
+            columns=columns,
+            filter=self.filter_expression(**filters),
+            batch_size=batch_size
+        )
+    
+    def count(self, **filters) -> int:
+        return self.dataset.count_rows(filter=self.filter_expression(**filters))
+    
+    @staticmethod
+    def score_matrix(table: pa.Table) -> np.ndarray:
+        """Ocene kot matrika float32 (vrstice x oznake); manjkajoče ocene so NaN."""
+        return np.column_stack([
+            pc.fill_null(table.column(column), np.nan).to_numpy()
+            for column in SCORE_COLUMNS
+        ]).astype(np.float32, copy=False)
+
+def _parse_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if value:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return datetime.now(timezone.utc)
@@ -0,0 +1,251 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from src.data_collection.news_scraper import ScrapedArticle
+from src.models.model_registry import ModelRegistry
+from src.sentiment.analyzer import SentimentResult
+from src.summarization.summary_router import RoutedSummary
+from src.monitoring.metrics import (
+    BATCH_FILL, QUEUE_DEPTH, QUEUE_REJECTED, REQUEST_LATENCY, observe_stage
+)
+
+class ServerBusyError(RuntimeError):
+    """Vrsta zahtev je polna; odjemalec naj poskusi znova kasneje."""
+
+class LatencyWindow:
+    """Zakasnitve zadnjih `size` zahtev za sprotne percentile."""
+    
+    def __init__(self, size: int = 1000):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+    
+    def add(self, seconds: float):
+        with self._lock:
+            self._values.append(seconds)
+    
+    def percentiles(self, *quantiles: float) -> List[float]:
+        with self._lock:
+            values = np.fromiter(self._values, dtype=np.float64, count=len(self._values))
+        if not len(values):
+            return [0.0] * len(quantiles)
+        return [float(value) for value in np.percentile(values, [100 * q for q in quantiles])]
+
+class MicroBatcher:
+    """Zbira klice iz več niti v mikro pakete in jih obdela z eno funkcijo.
+    
+    Paket se zapre, ko doseže `max_batch_size` ali ko od prve zahteve v paketu
+    preteče `max_wait` sekund. Vrsta je omejena na `max_queue_size`; ko je polna,
+    `submit` po `submit_timeout` sekundah sproži ServerBusyError.
+    """
+    
+    def __init__(self, name: str, process: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait: float = 0.02,
+                 max_queue_size: int = 256, submit_timeout: float = 2.0, workers: int = 1):
+        self.name = name
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.submit_timeout = submit_timeout
+        self.logger = logging.getLogger(__name__)
+        self.latency = LatencyWindow()
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future, float]]]" = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._rejected = 0
+        self._fill_sum = 0.0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-batcher-{idx}", daemon=True)
+            for idx in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        try:
+            self._queue.put((item, future, time.perf_counter()), timeout=self.submit_timeout)
+        except queue.Full:
+            QUEUE_REJECTED.labels(self.name).inc()
+            with self._stats_lock:
+                self._rejected += 1
+            raise ServerBusyError(f"Vrsta '{self.name}' je polna ({self._queue.maxsize} zahtev)")
+        QUEUE_DEPTH.labels(self.name).set(self._queue.qsize())
+        return future
+    
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        return self.submit(item).result(timeout)
+    
+    def stats(self) -> Dict[str, float]:
+        p50, p95 = self.latency.percentiles(0.5, 0.95)
+        with self._stats_lock:
+            return {
+                'requests': self._requests,
+                'batches': self._batches,
+                'rejected': self._rejected,
+                'queue_depth': self._queue.qsize(),
+                'mean_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'fill_ratio': self._fill_sum / self._batches if self._batches else 0.0,
+                'latency_p50_ms': 1000 * p50,
+                'latency_p95_ms': 1000 * p95
+            }
+    
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+    
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            
+            batch = [entry]
+            stop = False
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            
+            QUEUE_DEPTH.labels(self.name).set(self._queue.qsize())
+            self._process_batch(batch)
+            if stop:
+                return
+    
+    def _process_batch(self, batch: List[Tuple[Any, Future, float]]):
+        items = [item for item, _, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = self.process(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Paket '{self.name}' vrnil {len(results)} rezultatov za {len(items)} zahtev")
+        except Exception as e:
+            self.logger.error(f"Napaka pri obdelavi paketa '{self.name}': {str(e)}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            observe_stage(self.name, time.perf_counter() - start, len(batch))
+        
+        fill_ratio = len(batch) / self.max_batch_size
+        BATCH_FILL.labels(self.name).observe(fill_ratio)
+        done = time.perf_counter()
+        for (_, future, enqueued), result in zip(batch, results):
+            self.latency.add(done - enqueued)
+            REQUEST_LATENCY.labels(self.name).observe(done - enqueued)
+            future.set_result(result)
+        with self._stats_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._fill_sum += fill_ratio
+
+class AnalysisServer:
+    """Strežba za grafični vmesnik: sočasno strganje ter skupni paketi povzemanja in sentimenta.
+    
+    Zahteve vseh uporabnikov gredo skozi tri MicroBatcherje, zato se sočasni klici
+    povzemanja in ocenjevanja združijo v skupne prehode modelov.
+    """
+    
+    def __init__(self, registry: ModelRegistry, config: Dict):
+        serving = config['serving']
+        self.registry = registry
+        self.scraper = registry.scraper()
+        self.summary_router = registry.summary_router()
+        self.request_timeout = serving['request_timeout']
+        self.latency = LatencyWindow()
+        self.logger = logging.getLogger(__name__)
+        self.scrape_batcher = self._batcher('scrape', self._scrape_batch, serving)
+        self.summarize_batcher = self._batcher('summarize', self._summarize_batch, serving)
+        self.score_batcher = self._batcher('score', self._score_batch, serving)
+    
+    def scrape(self, url: str) -> List[ScrapedArticle]:
+        return self.submit_scrape(url).result(self.request_timeout)
+    
+    def summarize(self, text: str, sentences: List[str], profile: Optional[str] = None) -> RoutedSummary:
+        return self.submit_summarize(text, sentences, profile).result(self.request_timeout)
+    
+    def score(self, text: str, sentences: Optional[List[str]] = None) -> Optional[SentimentResult]:
+        return self.submit_score(text, sentences).result(self.request_timeout)
+    
+    def submit_scrape(self, url: str) -> Future:
+        return self.scrape_batcher.submit(url)
+    
+    def submit_summarize(self, text: str, sentences: List[str], profile: Optional[str] = None) -> Future:
+        return self.summarize_batcher.submit((text, sentences, profile))
+    
+    def submit_score(self, text: str, sentences: Optional[List[str]] = None) -> Future:
+        return self.score_batcher.submit((text, sentences or []))
+    
+    def record_request(self, seconds: float):
+        """Zabeleži zakasnitev celotne zahteve vmesnika."""
+        self.latency.add(seconds)
+        REQUEST_LATENCY.labels('request').observe(seconds)
+    
+    def stats(self) -> Dict[str, Dict]:
+        p50, p95 = self.latency.percentiles(0.5, 0.95)
+        return {
+            'request': {'latency_p50_ms': 1000 * p50, 'latency_p95_ms': 1000 * p95},
+            'scrape': self.scrape_batcher.stats(),
+            'summarize': self.summarize_batcher.stats(),
+            'score': self.score_batcher.stats()
+        }
+    
+    def close(self):
+        for batcher in (self.scrape_batcher, self.summarize_batcher, self.score_batcher):
+            batcher.close()
+    
+    def _batcher(self, name: str, process: Callable, serving: Dict) -> MicroBatcher:
+        settings = serving[name]
+        return MicroBatcher(
+            name,
+            process,
+            max_batch_size=settings['max_batch_size'],
+            max_wait=settings['max_wait_ms'] / 1000,
+            max_queue_size=serving['max_queue_size'],
+            submit_timeout=serving['submit_timeout'],
+            workers=settings['workers']
+        )
+    
+    def _scrape_batch(self, urls: List[str]) -> List[List[ScrapedArticle]]:
+        # En paket URL-jev si deli bazen povezav in omejitve po strežnikih
+        scraped = self.scraper.scrape_urls(urls)
+        return [scraped.get(url, []) for url in urls]
+    
+    def _summarize_batch(self, items: List[Tuple[str, List[str], Optional[str]]]) -> List[RoutedSummary]:
+        # Zahteve z različnimi profili dekodiranja ne morejo deliti klica generate
+        by_profile: Dict[Optional[str], List[int]] = {}
+        for idx, (_, _, profile) in enumerate(items):
+            by_profile.setdefault(profile, []).append(idx)
+        
+        results: List[Optional[RoutedSummary]] = [None] * len(items)
+        for profile, indices in by_profile.items():
+            summaries = self.summary_router.summarize_batch(
+                [items[idx][0] for idx in indices],
+                [items[idx][1] for idx in indices],
+                profile=profile
+            )
+            for idx, summary in zip(indices, summaries):
+                results[idx] = summary
+        return results
+    
+    def _score_batch(self, items: List[Tuple[str, List[str]]]) -> List[Optional[SentimentResult]]:
+        return self.registry.sentiment_analyzer().analyze_batch(
+            [text for text, _ in items],
+            batch_size=len(items),
+            sentence_splitter=self.registry.sentence_splitter(),
+            sentences=[sentences for _, sentences in items]
+        )
@@ -0,0 +1,35 @@
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional, Union
+
+class WalConnection:
+    """Povezava na SQLite bazo v načinu WAL, ki jo lahko hkrati uporablja več procesov.
+    
+    Povezave ne delimo med procesi (npr. po fork), zato se v vsakem procesu odpre nova.
+    """
+    
+    def __init__(self, path: Union[str, Path], timeout: float = 30):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+    
+    def get(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                str(self.path),
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._conn
+    
+    def close(self):
+        # Povezavo, podedovano od starševskega procesa, le pozabimo
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
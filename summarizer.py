@@ -1,41 +1,390 @@
-from transformers import T5ForConditionalGeneration, T5Tokenizer
+from transformers import T5Tokenizer
 import torch
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import logging
+import time
+from pydantic import BaseModel
+from src.storage.result_cache import ResultCache
+from src.models.inference_backends import load_seq2seq
+from src.monitoring.metrics import observe_tokens
+
+class LongSummary(BaseModel):
+    summary: str
+    num_chunks: int
+    input_tokens: int
+
+class DecodingProfile(BaseModel):
+    num_beams: int
+    do_sample: bool = False
+    temperature: Optional[float] = None
+    early_stopping: bool = False
+    no_repeat_ngram_size: int = 0
+    length_penalty: float = 1.0
+    # Pričakovana latenca na članek (t5-base, CPU, 512 vhodnih žetonov, 150 izhodnih)
+    expected_latency_s: float
+
+DECODING_PROFILES = {
+    # Požrešno dekodiranje; ustavi se ob prvem koncu zaporedja
+    'fast': DecodingProfile(num_beams=1, no_repeat_ngram_size=3, expected_latency_s=1.2),
+    'balanced': DecodingProfile(num_beams=2, early_stopping=True, no_repeat_ngram_size=3,
+                                expected_latency_s=2.0),
+    'quality': DecodingProfile(num_beams=4, no_repeat_ngram_size=3, length_penalty=1.2,
+                               expected_latency_s=3.5),
+    # Prejšnje privzeto vedenje (vzorčenje z iskanjem v snopu)
+    'sampled': DecodingProfile(num_beams=4, do_sample=True, temperature=0.7,
+                               expected_latency_s=4.0)
+}
+
+def get_profile(name: str) -> DecodingProfile:
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Neznan profil dekodiranja: {name}")
+    return DECODING_PROFILES[name]
 
 class NewsSummarizer:
-    def __init__(self, model_name: str = 't5-base'):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    def __init__(self, model_name: str = 't5-base', cache: Optional[ResultCache] = None,
+                 device: Optional[str] = None, dtype: Optional[str] = None,
+                 backend: str = 'eager', onnx_cache_dir: str = "data/onnx",
+                 profile: str = 'balanced', seed: Optional[int] = None):
+        self.model_name = model_name
+        self.cache = cache
+        get_profile(profile)
+        self.profile = profile
+        # Fiksno seme: enak vhod vedno da enak povzetek, tudi pri vzorčenju
+        self.seed = seed
+        self.device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name).to(self.device)
+        self.backend = backend
+        self.model = load_seq2seq(
+            model_name,
+            backend=backend,
+            device=self.device,
+            dtype=dtype,
+            onnx_cache_dir=onnx_cache_dir
+        )
         self.logger = logging.getLogger(__name__)
+        self.max_input_length = 512
+        
+        # Prostor za predpono "summarize: " in končni žeton
+        prefix_tokens = len(self.tokenizer("summarize: ", add_special_tokens=False)['input_ids'])
+        self.chunk_token_budget = self.max_input_length - prefix_tokens - 1
     
-    def summarize(self, text: str, max_length: int = 150, min_length: int = 40) -> str:
+    def summarize(self, text: str, max_length: int = 150, min_length: int = 40,
+                  profile: Optional[str] = None, time_budget: Optional[float] = None) -> str:
+        """Povzetek enega besedila; `time_budget` (s) po potrebi predčasno ustavi generiranje."""
         try:
+            profile = profile or self.profile
+            cache_key = self._cache_key(text, max_length, min_length, profile)
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             # Pripravi vhodni tekst
             input_text = f"summarize: {text}"
             
             # Tokenizacija
-            inputs = self.tokenizer.encode(
+            input_ids = self.tokenizer.encode(
                 input_text,
-                return_tensors="pt",
-                max_length=512,
+                max_length=self.max_input_length,
                 truncation=True
-            ).to(self.device)
-            
-            # Generiranje povzetka
-            summary_ids = self.model.generate(
-                inputs,
-                max_length=max_length,
-                min_length=min_length,
-                do_sample=True,
-                num_beams=4,
-                temperature=0.7
             )
             
-            summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+            # Generiranje povzetka
+            start = time.perf_counter()
+            summary = self._generate_batch([input_ids], max_length, min_length,
+                                           profile, time_budget)[0]
+            if cache_key and not self._budget_exceeded(start, time_budget):
+                self.cache.put(cache_key, summary)
             return summary
             
         except Exception as e:
             self.logger.error(f"Napaka pri povzemanju: {str(e)}")
-            return "" 
\ No newline at end of file
+            return ""
+    
+    def summarize_batch(self, texts: List[str], max_length: int = 150, min_length: int = 40,
+                        batch_size: int = 8, max_batch_tokens: int = 4096,
+                        profile: Optional[str] = None,
+                        time_budget: Optional[float] = None) -> List[str]:
+        """Paketno povzemanje; povzetki so v vrstnem redu vhoda, "" za neuspela besedila.
+        
+        Besedila so razvrščena po dolžini v žetonih, paket pa je omejen z `batch_size`
+        in z `max_batch_tokens` (število vrstic krat dolžina najdaljšega vhoda).
+        `time_budget` (s) velja za celoten klic in se enakomerno deli med preostale pakete.
+        """
+        profile = profile or self.profile
+        get_profile(profile)
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        summaries = [""] * len(texts)
+        cache_keys: Dict[int, str] = {}
+        pending = list(range(len(texts)))
+        if self.cache:
+            # Modelu pošljemo le besedila, ki jih ni v predpomnilniku
+            pending = []
+            for idx, text in enumerate(texts):
+                key = self._cache_key(text, max_length, min_length, profile)
+                cached = self.cache.get(key)
+                if cached is None:
+                    cache_keys[idx] = key
+                    pending.append(idx)
+                else:
+                    summaries[idx] = cached
+        
+        encoded = self._encode_items(texts, pending)
+        order = sorted(encoded, key=lambda idx: len(encoded[idx]))
+        
+        batches = self._make_batches(order, encoded, batch_size, max_batch_tokens)
+        for position, indices in enumerate(batches):
+            max_time = None
+            if deadline is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    skipped = sum(len(batch) for batch in batches[position:])
+                    self.logger.warning(f"Časovni proračun porabljen, {skipped} besedil ni povzetih")
+                    break
+                max_time = remaining / (len(batches) - position)
+            
+            start = time.perf_counter()
+            try:
+                batch_summaries = self._generate_batch(
+                    [encoded[idx] for idx in indices],
+                    max_length,
+                    min_length,
+                    profile,
+                    max_time
+                )
+            except Exception as e:
+                # Ponovi posamično, da napako pripišemo le problematičnim besedilom
+                self.logger.error(f"Napaka pri paketnem povzemanju: {str(e)}")
+                for idx in indices:
+                    summaries[idx] = self.summarize(texts[idx], max_length, min_length,
+                                                    profile, max_time)
+                continue
+            
+            # Predčasno ustavljenih povzetkov ne shranjujemo v predpomnilnik
+            truncated = self._budget_exceeded(start, max_time)
+            for idx, summary in zip(indices, batch_summaries):
+                summaries[idx] = summary
+                if idx in cache_keys and not truncated:
+                    self.cache.put(cache_keys[idx], summary)
+        
+        return summaries
+    
+    def summarize_long(self, sentences: List[str], **kwargs) -> LongSummary:
+        """Povzemanje dolgega članka po delih; glej `summarize_long_batch`."""
+        return self.summarize_long_batch([sentences], **kwargs)[0]
+    
+    def summarize_long_batch(self, documents: List[List[str]], max_length: int = 150,
+                             min_length: int = 40, chunk_max_length: int = 80,
+                             chunk_min_length: int = 20, batch_size: int = 8,
+                             max_batch_tokens: int = 4096, max_rounds: int = 3,
+                             profile: Optional[str] = None,
+                             time_budget: Optional[float] = None) -> List[LongSummary]:
+        """Map-reduce povzemanje člankov, podanih kot seznami očiščenih povedi.
+        
+        Povedi se združijo v dele, ki se prilegajo vhodu modela. Deli vseh člankov
+        se povzamejo v skupnih paketih, nato se povzame še stik delnih povzetkov.
+        """
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        chunked = [self._chunk_sentences(sentences) for sentences in documents]
+        num_chunks = [len(chunks) for chunks in chunked]
+        input_tokens = [sum(tokens for _, tokens in chunks) for chunks in chunked]
+        pending = {idx: [chunk for chunk, _ in chunks] for idx, chunks in enumerate(chunked)}
+        
+        # Map: delne povzetke združujemo, dokler se ne prilegajo enemu vhodu
+        for _ in range(max_rounds):
+            multi = [idx for idx, chunks in pending.items() if len(chunks) > 1]
+            if not multi:
+                break
+            
+            flat = [(idx, chunk) for idx in multi for chunk in pending[idx]]
+            # Vsak krog dobi polovico preostanka, da ostane čas za končni povzetek
+            round_budget = None
+            if deadline is not None:
+                round_budget = max(deadline - time.perf_counter(), 0) / 2
+            partials = self.summarize_batch(
+                [chunk for _, chunk in flat],
+                max_length=chunk_max_length,
+                min_length=chunk_min_length,
+                batch_size=batch_size,
+                max_batch_tokens=max_batch_tokens,
+                profile=profile,
+                time_budget=round_budget
+            )
+            
+            grouped: Dict[int, List[str]] = {idx: [] for idx in multi}
+            for (idx, _), partial in zip(flat, partials):
+                if partial:
+                    grouped[idx].append(partial)
+            for idx, parts in grouped.items():
+                pending[idx] = [chunk for chunk, _ in self._chunk_sentences(parts)]
+        
+        for idx, chunks in pending.items():
+            if len(chunks) > 1:
+                self.logger.warning(
+                    f"Delni povzetki članka {idx} po {max_rounds} krogih presegajo vhod modela"
+                )
+        
+        # Reduce: končni povzetek iz (združenih) delov
+        summaries = self.summarize_batch(
+            [' '.join(pending[idx]) for idx in range(len(documents))],
+            max_length=max_length,
+            min_length=min_length,
+            batch_size=batch_size,
+            max_batch_tokens=max_batch_tokens,
+            profile=profile,
+            time_budget=max(deadline - time.perf_counter(), 0) if deadline is not None else None
+        )
+        
+        return [
+            LongSummary(summary=summary, num_chunks=chunks, input_tokens=tokens)
+            for summary, chunks, tokens in zip(summaries, num_chunks, input_tokens)
+        ]
+    
+    def _chunk_sentences(self, sentences: List[str]) -> List[Tuple[str, int]]:
+        """Združi povedi v dele z največ `chunk_token_budget` žetoni."""
+        sentences = [s for s in sentences if s and s.strip()]
+        if not sentences:
+            return []
+        
+        counts = self.tokenizer(sentences, add_special_tokens=False)['input_ids']
+        chunks = []
+        current: List[str] = []
+        current_tokens = 0
+        for sentence, ids in zip(sentences, counts):
+            if len(ids) > self.chunk_token_budget:
+                # Predolgo poved razdelimo po besedah
+                pieces = self._split_words(sentence)
+            else:
+                pieces = [(sentence, len(ids))]
+            
+            for piece, tokens in pieces:
+                if current and current_tokens + tokens > self.chunk_token_budget:
+                    chunks.append((' '.join(current), current_tokens))
+                    current = []
+                    current_tokens = 0
+                current.append(piece)
+                current_tokens += tokens
+        
+        if current:
+            chunks.append((' '.join(current), current_tokens))
+        return chunks
+    
+    def _split_words(self, sentence: str) -> List[Tuple[str, int]]:
+        words = sentence.split()
+        counts = self.tokenizer(words, add_special_tokens=False)['input_ids']
+        pieces = []
+        current: List[str] = []
+        current_tokens = 0
+        for word, ids in zip(words, counts):
+            if current and current_tokens + len(ids) > self.chunk_token_budget:
+                pieces.append((' '.join(current), current_tokens))
+                current = []
+                current_tokens = 0
+            current.append(word)
+            current_tokens += len(ids)
+        if current:
+            pieces.append((' '.join(current), current_tokens))
+        return pieces
+    
+    def _generation_kwargs(self, max_length: int, min_length: int, profile: str) -> Dict:
+        settings = get_profile(profile)
+        kwargs = {
+            'max_length': max_length,
+            'min_length': min_length,
+            'do_sample': settings.do_sample,
+            'num_beams': settings.num_beams,
+            'early_stopping': settings.early_stopping,
+            'no_repeat_ngram_size': settings.no_repeat_ngram_size,
+            'length_penalty': settings.length_penalty
+        }
+        if settings.do_sample:
+            kwargs['temperature'] = settings.temperature
+        return kwargs
+    
+    def _cache_key(self, text: str, max_length: int, min_length: int, profile: str) -> Optional[str]:
+        if not self.cache:
+            return None
+        params = dict(self._generation_kwargs(max_length, min_length, profile),
+                      max_input_length=self.max_input_length,
+                      backend=self.backend)
+        if get_profile(profile).do_sample:
+            # Vzorčeni povzetki so ponovljivi le pri istem semenu
+            params['seed'] = self.seed
+        return self.cache.make_key(text, self.model_name, params)
+    
+    @staticmethod
+    def _budget_exceeded(start: float, time_budget: Optional[float]) -> bool:
+        return time_budget is not None and time.perf_counter() - start >= time_budget
+    
+    def _encode_items(self, texts: List[str], indices: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Tokenizira besedila brez dopolnjevanja; neuspela besedila izpusti in zabeleži."""
+        encoded = {}
+        if indices is None:
+            indices = range(len(texts))
+        for idx in indices:
+            text = texts[idx]
+            if not isinstance(text, str) or not text.strip():
+                self.logger.error(f"Napaka pri povzemanju: prazno besedilo na mestu {idx}")
+                continue
+            try:
+                encoded[idx] = self.tokenizer(
+                    f"summarize: {text}",
+                    max_length=self.max_input_length,
+                    truncation=True
+                )['input_ids']
+            except Exception as e:
+                self.logger.error(f"Napaka pri tokenizaciji besedila na mestu {idx}: {str(e)}")
+        return encoded
+    
+    def _make_batches(self, order: List[int], encoded: Dict[int, List[int]],
+                      batch_size: int, max_batch_tokens: int) -> List[List[int]]:
+        # Vhodi so urejeni naraščajoče, zato zadnji element določa dolžino paketa
+        batches = []
+        current: List[int] = []
+        for idx in order:
+            padded_tokens = (len(current) + 1) * len(encoded[idx])
+            if current and (len(current) >= batch_size or padded_tokens > max_batch_tokens):
+                batches.append(current)
+                current = []
+            current.append(idx)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _generate_batch(self, input_ids: List[List[int]], max_length: int, min_length: int,
+                        profile: str, max_time: Optional[float] = None) -> List[str]:
+        kwargs = self._generation_kwargs(max_length, min_length, profile)
+        if max_time is not None:
+            kwargs['max_time'] = max_time
+        
+        if self.seed is not None and kwargs['do_sample'] and len(input_ids) > 1:
+            # Vzorec je odvisen od sestave paketa, zato v determinističnem načinu
+            # vsako besedilo generiramo posebej z istim semenom
+            row_time = max_time / len(input_ids) if max_time is not None else None
+            return [
+                self._generate_batch([ids], max_length, min_length, profile, row_time)[0]
+                for ids in input_ids
+            ]
+        
+        # Dinamično dopolnjevanje do najdaljšega vhoda v paketu
+        inputs = self.tokenizer.pad(
+            {'input_ids': input_ids},
+            padding=True,
+            return_tensors="pt"
+        ).to(self.device)
+        
+        if self.seed is not None:
+            torch.manual_seed(self.seed)
+        with torch.no_grad():
+            summary_ids = self.model.generate(
+                input_ids=inputs['input_ids'],
+                attention_mask=inputs['attention_mask'],
+                **kwargs
+            )
+        
+        observe_tokens(
+            'summarize',
+            int(inputs['attention_mask'].sum()),
+            int((summary_ids != self.tokenizer.pad_token_id).sum())
+        )
+        return self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+from src.summarization.summarizer import NewsSummarizer
+from src.monitoring.metrics import SUMMARY_TIERS
+
+TIERS = ('passthrough', 'extractive', 'abstractive')
+
+class RoutedSummary(BaseModel):
+    summary: str
+    tier: str
+    num_chunks: int = 0
+    input_tokens: int = 0
+    # Povedi povzetka, kadar so meje znane (prepis in izvlečni povzetek)
+    sentences: List[str] = []
+
+class TierStats(BaseModel):
+    count: int = 0
+    seconds: float = 0.0
+    
+    @property
+    def ms_per_article(self) -> float:
+        return 1000 * self.seconds / self.count if self.count else 0.0
+
+class ExtractiveSummarizer:
+    """TextRank: povedi rangira po podobnosti z ostalimi povedmi v članku."""
+    
+    def __init__(self, max_sentences: int = 3, damping: float = 0.85,
+                 max_iterations: int = 50, tolerance: float = 1e-6):
+        self.max_sentences = max_sentences
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+    
+    def summarize(self, sentences: List[str]) -> str:
+        return ' '.join(self.select(sentences))
+    
+    def select(self, sentences: List[str]) -> List[str]:
+        sentences = [s for s in sentences if s and s.strip()]
+        if len(sentences) <= self.max_sentences:
+            return sentences
+        
+        scores = self.rank(sentences)
+        # Izbrane povedi ohranijo vrstni red iz članka
+        selected = sorted(np.argsort(-scores, kind='stable')[:self.max_sentences])
+        return [sentences[idx] for idx in selected]
+    
+    def rank(self, sentences: List[str]) -> np.ndarray:
+        vocabulary: Dict[str, int] = {}
+        rows = [
+            {vocabulary.setdefault(word, len(vocabulary)) for word in sentence.split()}
+            for sentence in sentences
+        ]
+        occurrences = np.zeros((len(rows), len(vocabulary)), dtype=np.float32)
+        for row, words in enumerate(rows):
+            occurrences[row, list(words)] = 1.0
+        
+        # Podobnost po Mihalcea in Tarau: skupne besede / (log|Si| + log|Sj|)
+        overlap = occurrences @ occurrences.T
+        log_lengths = np.log(np.maximum(occurrences.sum(axis=1), 1.0))
+        norm = log_lengths[:, None] + log_lengths[None, :]
+        similarity = np.divide(overlap, norm, out=np.zeros_like(overlap), where=norm > 0)
+        np.fill_diagonal(similarity, 0.0)
+        
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity),
+                               where=out_weight > 0)
+        
+        count = len(sentences)
+        scores = np.full(count, 1.0 / count, dtype=np.float32)
+        for _ in range(self.max_iterations):
+            updated = (1 - self.damping) / count + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < self.tolerance:
+                return updated
+            scores = updated
+        return scores
+
+class SummaryRouter:
+    """Usmerja besedila med tri stopnje povzemanja glede na število besed.
+    
+    Kratka besedila (npr. odrezana polja `content` iz NewsAPI) gredo naprej nespremenjena,
+    srednje dolga povzame ExtractiveSummarizer, T5 pa dobi le dolge članke.
+    """
+    
+    def __init__(self, load_summarizer: Callable[[], NewsSummarizer], config: Dict):
+        # T5 se naloži šele, ko prvič dobimo dolg članek
+        self.load_summarizer = load_summarizer
+        self.config = config
+        routing = config['routing']
+        self.enabled = routing['enabled']
+        self.passthrough_max_words = routing['passthrough_max_words']
+        self.extractive_max_words = routing['extractive_max_words']
+        self.extractive = ExtractiveSummarizer(routing['extractive_sentences'])
+        self.logger = logging.getLogger(__name__)
+        self._stats = {tier: TierStats() for tier in TIERS}
+        self._lock = threading.Lock()
+    
+    def route(self, text: str) -> str:
+        if not self.enabled:
+            return 'abstractive'
+        words = len(text.split())
+        if words <= self.passthrough_max_words:
+            return 'passthrough'
+        if words <= self.extractive_max_words:
+            return 'extractive'
+        return 'abstractive'
+    
+    def summarize_batch(self, texts: List[str], sentences: Optional[List[List[str]]] = None,
+                        profile: Optional[str] = None) -> List[RoutedSummary]:
+        """Povzetki v vrstnem redu vhoda; `sentences` so očiščene povedi vsakega besedila."""
+        if sentences is None:
+            sentences = [[] for _ in texts]
+        
+        tiers = [self.route(text) for text in texts]
+        results: List[Optional[RoutedSummary]] = [None] * len(texts)
+        
+        start = time.perf_counter()
+        passthrough = [idx for idx, tier in enumerate(tiers) if tier == 'passthrough']
+        for idx in passthrough:
+            results[idx] = RoutedSummary(summary=texts[idx], tier='passthrough', sentences=sentences[idx])
+        self._record('passthrough', len(passthrough), time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        extractive = [idx for idx, tier in enumerate(tiers) if tier == 'extractive']
+        for idx in extractive:
+            try:
+                selected = self.extractive.select(sentences[idx] or [texts[idx]])
+            except Exception as e:
+                self.logger.error(f"Napaka pri izvlečnem povzemanju: {str(e)}")
+                selected = []
+            results[idx] = RoutedSummary(
+                summary=' '.join(selected),
+                tier='extractive',
+                # Brez očiščenih povedi je edina "poved" celotno besedilo
+                sentences=selected if sentences[idx] else []
+            )
+        self._record('extractive', len(extractive), time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        abstractive = [idx for idx, tier in enumerate(tiers) if tier == 'abstractive']
+        if abstractive:
+            summaries = self._abstractive(
+                [texts[idx] for idx in abstractive],
+                [sentences[idx] for idx in abstractive],
+                profile
+            )
+            for idx, summary in zip(abstractive, summaries):
+                results[idx] = summary
+        self._record('abstractive', len(abstractive), time.perf_counter() - start)
+        
+        return results
+    
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                tier: {
+                    'count': stats.count,
+                    'seconds': stats.seconds,
+                    'ms_per_article': stats.ms_per_article
+                }
+                for tier, stats in self._stats.items()
+            }
+    
+    def merge_stats(self, stats: Dict[str, Dict]):
+        """Prišteje statistiko stopenj iz drugega procesa (npr. bazena procesov)."""
+        with self._lock:
+            for tier, values in stats.items():
+                self._stats[tier].count += values['count']
+                self._stats[tier].seconds += values['seconds']
+    
+    def _abstractive(self, texts: List[str], sentences: List[List[str]],
+                     profile: Optional[str]) -> List[RoutedSummary]:
+        config = self.config
+        summarizer = self.load_summarizer()
+        long_config = config['long_document']
+        if long_config['enabled']:
+            # Brez očiščenih povedi se celotno besedilo razdeli po besedah
+            long_summaries = summarizer.summarize_long_batch(
+                [document or [text] for text, document in zip(texts, sentences)],
+                max_length=config['max_length'],
+                min_length=config['min_length'],
+                chunk_max_length=long_config['chunk_max_length'],
+                chunk_min_length=long_config['chunk_min_length'],
+                batch_size=config['batch_size'],
+                max_batch_tokens=config['max_batch_tokens'],
+                max_rounds=long_config['max_rounds'],
+                profile=profile or config['profile'],
+                time_budget=config['time_budget']
+            )
+            return [
+                RoutedSummary(
+                    summary=long_summary.summary,
+                    tier='abstractive',
+                    num_chunks=long_summary.num_chunks,
+                    input_tokens=long_summary.input_tokens
+                )
+                for long_summary in long_summaries
+            ]
+        
+        summaries = summarizer.summarize_batch(
+            texts,
+            max_length=config['max_length'],
+            min_length=config['min_length'],
+            batch_size=config['batch_size'],
+            max_batch_tokens=config['max_batch_tokens'],
+            profile=profile or config['profile'],
+            time_budget=config['time_budget']
+        )
+        return [RoutedSummary(summary=summary, tier='abstractive') for summary in summaries]
+    
+    def _record(self, tier: str, count: int, seconds: float):
+        if not count:
+            return
+        SUMMARY_TIERS.labels(tier).inc(count)
+        with self._lock:
+            self._stats[tier].count += count
+            self._stats[tier].seconds += seconds
@@ -0,0 +1,128 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.data_collection.news_scraper import AsyncFinancialNewsScraper
+
+ARTICLE_HTML = (
+    "<html><head><title>Rates</title></head><body>"
+    "<article><h1>Rates on hold</h1><p>The central bank kept rates unchanged.</p></article>"
+    "</body></html>"
+)
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    """Lokalni strežnik: /flaky najprej vrne 503 in 429, /slow/* beleži sočasnost, /etag podpira 304."""
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, time.monotonic(), self.headers.get('If-None-Match')))
+        
+        if self.path == '/flaky':
+            with server.lock:
+                attempt = sum(path == '/flaky' for path, _, _ in server.requests)
+            if attempt <= 2:
+                self._send(503 if attempt == 1 else 429)
+                return
+        elif self.path.startswith('/slow/'):
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(0.05)
+            with server.lock:
+                server.active -= 1
+        elif self.path.startswith('/etag/'):
+            etag = f'"{self.path}-v1"'
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304)
+                return
+            self._send(200, ARTICLE_HTML, {'ETag': etag})
+            return
+        self._send(200, ARTICLE_HTML)
+    
+    def _send(self, status, body='', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ArticleHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.active = 0
+    server.max_active = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_scraper(**kwargs):
+    options = {'requests_per_second': 0, 'timeout': 5.0, 'backoff': 0.05}
+    options.update(kwargs)
+    return AsyncFinancialNewsScraper(**options)
+
+def test_retries_429_and_5xx_with_backoff(server):
+    url = f"{server.base_url}/flaky"
+    articles = make_scraper(max_retries=3).scrape_urls([url])[url]
+    
+    assert [article.content for article in articles] == ["Rates on hold The central bank kept rates unchanged."]
+    times = [at for path, at, _ in server.requests if path == '/flaky']
+    assert len(times) == 3
+    # Eksponentno čakanje: 0.05 s in nato 0.1 s
+    assert times[1] - times[0] >= 0.05
+    assert times[2] - times[1] >= 0.1
+
+def test_gives_up_after_max_retries(server):
+    url = f"{server.base_url}/flaky"
+    assert make_scraper(max_retries=1).scrape_urls([url]) == {url: []}
+    assert sum(path == '/flaky' for path, _, _ in server.requests) == 2
+
+def test_per_host_concurrency_cap(server):
+    urls = [f"{server.base_url}/slow/{i}" for i in range(8)]
+    results = make_scraper(concurrency=20, per_host_concurrency=2).scrape_urls(urls)
+    
+    assert all(results[url] for url in urls)
+    assert server.max_active == 2
+
+def test_conditional_get_returns_cached_articles_on_304(server):
+    url = f"{server.base_url}/etag/a"
+    scraper = make_scraper()
+    first = scraper.scrape_urls([url])[url]
+    second = scraper.scrape_urls([url])[url]
+    
+    assert first and second == first
+    assert [if_none_match for _, _, if_none_match in server.requests] == [None, '"/etag/a-v1"']
+
+def test_conditional_cache_shared_between_threads(server):
+    # Kot v AnalysisServer: več niti kliče scrape_urls na istem strgalniku
+    scraper = make_scraper(max_conditional_entries=3)
+    urls = [f"{server.base_url}/etag/{i}" for i in range(6)]
+    errors = []
+    
+    def run():
+        try:
+            for _ in range(5):
+                results = scraper.scrape_urls(urls)
+                assert all(results[url] for url in urls)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert not errors
+    assert len(scraper._conditional) == 3
@@ -1,31 +1,95 @@
 import re
-from typing import List
+import threading
+from typing import Iterable, Iterator, List, Optional
 import nltk
 from nltk.tokenize import sent_tokenize
 from nltk.corpus import stopwords
 
+TAG_PATTERN = re.compile(r'<[^>]+>')
+SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s]')
+
+# Posebne znake v ASCII besedilih odstranimo s str.translate, kar je hitreje od regularnega izraza
+ASCII_SPECIAL_CHARS = {
+    code: None for code in range(128) if SPECIAL_CHARS_PATTERN.match(chr(code))
+}
+
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords'
+}
+
+# Novejše različice NLTK za sent_tokenize potrebujejo punkt_tab
+SENTENCE_RESOURCES = ['punkt', 'punkt_tab']
+
+_nltk_lock = threading.Lock()
+_nltk_loaded = set()
+_stop_words = None
+
+def ensure_nltk_resource(package: str, data_dir: Optional[str] = None):
+    """Enkrat na proces preveri NLTK vir v lokalni mapi in ga prenese le, če manjka."""
+    if package in _nltk_loaded:
+        return
+    with _nltk_lock:
+        if package in _nltk_loaded:
+            return
+        if data_dir and data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+        try:
+            nltk.data.find(NLTK_RESOURCES[package])
+        except LookupError:
+            nltk.download(package, download_dir=data_dir, quiet=True)
+        _nltk_loaded.add(package)
+
 class TextCleaner:
-    def __init__(self):
-        nltk.download('punkt')
-        nltk.download('stopwords')
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, nltk_data: Optional[str] = None):
+        # NLTK podatki se naložijo šele ob prvi uporabi
+        self.nltk_data = nltk_data
+    
+    @property
+    def stop_words(self) -> set:
+        global _stop_words
+        if _stop_words is None:
+            ensure_nltk_resource('stopwords', self.nltk_data)
+            _stop_words = set(stopwords.words('english'))
+        return _stop_words
     
     def clean_text(self, text: str) -> str:
         # Odstrani HTML oznake
-        text = re.sub(r'<[^>]+>', '', text)
+        if '<' in text:
+            text = TAG_PATTERN.sub('', text)
         
         # Odstrani posebne znake
-        text = re.sub(r'[^\w\s]', '', text)
+        if text.isascii():
+            text = text.translate(ASCII_SPECIAL_CHARS)
+        else:
+            text = SPECIAL_CHARS_PATTERN.sub('', text)
         
         # Normalizacija presledkov
-        text = ' '.join(text.split())
-        
-        return text.lower()
+        return ' '.join(text.split()).lower()
+    
+    def clean_batch(self, texts: Iterable[str]) -> Iterator[str]:
+        clean = self.clean_text
+        for text in texts:
+            yield clean(text)
     
     def split_into_sentences(self, text: str) -> List[str]:
+        for package in SENTENCE_RESOURCES:
+            ensure_nltk_resource(package, self.nltk_data)
         return sent_tokenize(text)
     
+    def clean_sentences(self, text: str) -> List[str]:
+        """Razdeli besedilo na povedi pred čiščenjem, ki odstrani ločila."""
+        text = TAG_PATTERN.sub('', text)
+        sentences = (self.clean_text(sentence) for sentence in self.split_into_sentences(text))
+        return [sentence for sentence in sentences if sentence]
+    
     def remove_stopwords(self, text: str) -> str:
         words = text.split()
         filtered_words = [word for word in words if word not in self.stop_words]
-        return ' '.join(filtered_words) 
\ No newline at end of file
+        return ' '.join(filtered_words)
+    
+    def remove_stopwords_batch(self, texts: Iterable[str]) -> Iterator[str]:
+        stop_words = self.stop_words
+        for text in texts:
+            yield ' '.join(word for word in text.split() if word not in stop_words)
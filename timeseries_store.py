@@ -0,0 +1,209 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from src.storage.sqlite_connection import WalConnection
+
+# Širina razreda v sekundah za vsako ločljivost povzetkov
+RESOLUTIONS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+class SentimentTimeSeriesStore:
+    """Časovna vrsta ocen sentimenta v SQLite (WAL) s sprotnimi povzetki.
+    
+    Zapisi se zbirajo v pomnilniku in vpišejo v paketih. Ob vsakem vpisu se
+    povzetki (minuta, ura, dan) po viru in oznaki posodobijo z upsertom, zato
+    poizvedbe nadzorne plošče berejo povzetke namesto surovih zapisov.
+    """
+    
+    def __init__(self, path: str = "data/timeseries/sentiment.sqlite", batch_size: int = 500,
+                 flush_interval: float = 5.0, raw_retention_days: Optional[float] = 30,
+                 rollup_retention_days: Optional[Dict[str, Optional[float]]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.raw_retention_days = raw_retention_days
+        self.rollup_retention_days = rollup_retention_days or {'minute': 7, 'hour': 180, 'day': None}
+        self.retention_check_interval = 3600
+        self.logger = logging.getLogger(__name__)
+        self._buffer: List[Tuple[float, str, str, float, str, str]] = []
+        self._last_flush = time.monotonic()
+        self._last_retention = 0.0
+        self._lock = threading.Lock()
+        self._db = WalConnection(self.path)
+        
+        with self._lock:
+            conn = self._db.get()
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sentiment_raw (
+                    ts REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    title TEXT,
+                    url TEXT
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_raw_ts ON sentiment_raw(ts)")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sentiment_rollup (
+                    resolution TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    confidence_sum REAL NOT NULL,
+                    confidence_min REAL NOT NULL,
+                    confidence_max REAL NOT NULL,
+                    PRIMARY KEY (resolution, bucket, source, label)
+                ) WITHOUT ROWID"""
+            )
+    
+    def add(self, timestamp: Union[str, float, None], source: str, label: str,
+            confidence: float, title: str = "", url: str = ""):
+        """Doda zapis; `timestamp` je ISO 8601 niz ali epoch sekunde (None = zdaj)."""
+        try:
+            ts = self._parse_timestamp(timestamp)
+        except ValueError:
+            self.logger.warning(f"Neveljaven časovni žig {timestamp}, uporabljen je trenutni čas")
+            ts = time.time()
+        with self._lock:
+            self._buffer.append((ts, source or "", label, float(confidence), title, url))
+            due = (len(self._buffer) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+    
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            
+            # Povzetke paketa najprej združimo v pomnilniku, nato en upsert na razred
+            rollups: Dict[Tuple[str, int, str, str], List[float]] = {}
+            for ts, source, label, confidence, _, _ in rows:
+                for resolution, width in RESOLUTIONS.items():
+                    key = (resolution, int(ts // width) * width, source, label)
+                    entry = rollups.get(key)
+                    if entry is None:
+                        rollups[key] = [1, confidence, confidence, confidence]
+                    else:
+                        entry[0] += 1
+                        entry[1] += confidence
+                        entry[2] = min(entry[2], confidence)
+                        entry[3] = max(entry[3], confidence)
+            
+            try:
+                conn = self._db.get()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO sentiment_raw (ts, source, label, confidence, title, url) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    conn.executemany(
+                        """INSERT INTO sentiment_rollup
+                            (resolution, bucket, source, label, count, confidence_sum,
+                             confidence_min, confidence_max)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (resolution, bucket, source, label) DO UPDATE SET
+                            count = count + excluded.count,
+                            confidence_sum = confidence_sum + excluded.confidence_sum,
+                            confidence_min = MIN(confidence_min, excluded.confidence_min),
+                            confidence_max = MAX(confidence_max, excluded.confidence_max)""",
+                        [key + tuple(values) for key, values in rollups.items()]
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                
+                if time.time() - self._last_retention >= self.retention_check_interval:
+                    self._apply_retention(conn)
+            
+            except Exception as e:
+                self.logger.error(f"Napaka pri pisanju časovne vrste: {str(e)}")
+    
+    def query(self, resolution: str = 'hour', start: Union[str, float, None] = None,
+              end: Union[str, float, None] = None, source: Optional[str] = None,
+              label: Optional[str] = None) -> List[Dict]:
+        """Povzetki v časovnem oknu [start, end), urejeni po času."""
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Neznana ločljivost: {resolution}")
+        self.flush()
+        
+        conditions = ["resolution = ?"]
+        params: List = [resolution]
+        if start is not None:
+            conditions.append("bucket >= ?")
+            params.append(self._parse_timestamp(start))
+        if end is not None:
+            conditions.append("bucket < ?")
+            params.append(self._parse_timestamp(end))
+        if source is not None:
+            conditions.append("source = ?")
+            params.append(source)
+        if label is not None:
+            conditions.append("label = ?")
+            params.append(label)
+        
+        with self._lock:
+            rows = self._db.get().execute(
+                "SELECT bucket, source, label, count, confidence_sum, confidence_min, confidence_max "
+                f"FROM sentiment_rollup WHERE {' AND '.join(conditions)} ORDER BY bucket",
+                params
+            ).fetchall()
+        
+        return [
+            {
+                'bucket': bucket,
+                'source': row_source,
+                'label': row_label,
+                'count': count,
+                'mean_confidence': confidence_sum / count,
+                'min_confidence': confidence_min,
+                'max_confidence': confidence_max
+            }
+            for bucket, row_source, row_label, count, confidence_sum, confidence_min, confidence_max in rows
+        ]
+    
+    def apply_retention(self):
+        """Odstrani surove zapise in povzetke, starejše od nastavljenih rokov hrambe."""
+        with self._lock:
+            self._apply_retention(self._db.get())
+    
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+    
+    def _apply_retention(self, conn: sqlite3.Connection):
+        now = time.time()
+        self._last_retention = now
+        if self.raw_retention_days is not None:
+            conn.execute("DELETE FROM sentiment_raw WHERE ts < ?",
+                         (now - self.raw_retention_days * 86400,))
+        for resolution, days in self.rollup_retention_days.items():
+            if days is not None:
+                conn.execute("DELETE FROM sentiment_rollup WHERE resolution = ? AND bucket < ?",
+                             (resolution, now - days * 86400))
+    
+    @staticmethod
+    def _parse_timestamp(timestamp: Union[str, float, None]) -> float:
+        if timestamp is None or timestamp == "":
+            return time.time()
+        if isinstance(timestamp, (int, float)):
+            return float(timestamp)
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        # Časi brez časovnega pasu so v UTC (kot v results_writer), ne v lokalnem času
+        return (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp()
@@ -0,0 +1,141 @@
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import torch
+from src.models.model_registry import ModelRegistry
+from src.sentiment.analyzer import SentimentResult
+from src.summarization.summary_router import RoutedSummary
+from src.monitoring.metrics import counter_deltas, counter_values, merge_counter_deltas
+
+_worker_registry: Optional[ModelRegistry] = None
+
+def _init_inference_worker(config: Dict, threads: int):
+    """Vsak proces ima svoj register modelov in lastno število niti za PyTorch."""
+    global _worker_registry
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    _worker_registry = ModelRegistry(config)
+
+def _warmup(kinds: Tuple[str, ...]) -> int:
+    if 'summarize' in kinds:
+        _worker_registry.summarizer()
+    if 'score' in kinds:
+        _worker_registry.sentiment_analyzer()
+    return os.getpid()
+
+def _tracked(run: Callable[[], List]) -> Tuple[List, Dict[str, Any]]:
+    # Števci in statistika ostanejo v procesu, zato staršu z rezultati vrnemo njihove spremembe
+    router = _worker_registry.summary_router()
+    cache = _worker_registry.cache
+    counters = counter_values()
+    tiers = router.stats()
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    
+    results = run()
+    
+    deltas = {
+        'counters': counter_deltas(counters),
+        'summary_tiers': {
+            tier: {
+                'count': stats['count'] - tiers[tier]['count'],
+                'seconds': stats['seconds'] - tiers[tier]['seconds']
+            }
+            for tier, stats in router.stats().items()
+        },
+        'cache': {'hits': cache.hits - hits, 'misses': cache.misses - misses} if cache else None
+    }
+    return results, deltas
+
+def _summarize_batch(texts: List[str], sentences: List[List[str]],
+                     profile: Optional[str]) -> Tuple[List[RoutedSummary], Dict[str, Any]]:
+    return _tracked(lambda: _worker_registry.summary_router().summarize_batch(texts, sentences, profile=profile))
+
+def _score_batch(texts: List[str], sentences: List[List[str]]) -> Tuple[List[Optional[SentimentResult]], Dict[str, Any]]:
+    return _tracked(lambda: _worker_registry.sentiment_analyzer().analyze_batch(
+        texts,
+        batch_size=len(texts) or 1,
+        sentence_splitter=_worker_registry.sentence_splitter(),
+        sentences=sentences
+    ))
+
+class InferenceWorkerPool:
+    """Bazen procesov za povzemanje in sentiment na več jedrih.
+    
+    Vsak proces naloži svoje modele in uporablja `threads_per_worker` niti. Paketi
+    gredo v skupno vrsto bazena, rezultati pa se vračajo v vrstnem redu vhoda.
+    Spremembe števcev Prometheus, statistike stopenj povzemanja in predpomnilnika
+    iz procesov se prištejejo metrikam glavnega procesa in `registry`.
+    """
+    
+    def __init__(self, config: Dict, num_workers: int = 4, threads_per_worker: Optional[int] = None,
+                 max_inflight: Optional[int] = None, start_method: str = 'spawn',
+                 registry: Optional[ModelRegistry] = None):
+        self.num_workers = num_workers
+        self.registry = registry
+        # Privzeto si procesi enakomerno razdelijo jedra
+        self.threads_per_worker = threads_per_worker or max((os.cpu_count() or 1) // num_workers, 1)
+        self.max_inflight = max_inflight or 2 * num_workers
+        self.logger = logging.getLogger(__name__)
+        # fork po inicializaciji PyTorch niti lahko zamrzne, zato privzeto spawn
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_inference_worker,
+            initargs=(config, self.threads_per_worker)
+        )
+    
+    def warmup(self, kinds: Tuple[str, ...] = ('summarize', 'score')):
+        """Naloži modele v vseh procesih, preden začnemo meriti ali streči."""
+        pids = set()
+        for _ in range(4 * self.num_workers):
+            pids.update(self._executor.map(_warmup, [kinds] * self.num_workers))
+            if len(pids) >= self.num_workers:
+                return
+        self.logger.warning(f"Ogretih le {len(pids)} od {self.num_workers} procesov")
+    
+    def summarize_batches(self, batches: Iterable[Tuple[List[str], List[List[str]]]],
+                          profile: Optional[str] = None) -> Iterator[List[RoutedSummary]]:
+        return map(self._merge, self.imap(
+            lambda batch: self._executor.submit(_summarize_batch, batch[0], batch[1], profile),
+            batches
+        ))
+    
+    def score_batches(self, batches: Iterable[Tuple[List[str], List[List[str]]]]) -> Iterator[List[Optional[SentimentResult]]]:
+        return map(self._merge, self.imap(
+            lambda batch: self._executor.submit(_score_batch, batch[0], batch[1]),
+            batches
+        ))
+    
+    def imap(self, submit: Callable[..., Future], items: Iterable) -> Iterator:
+        """Rezultati v vrstnem redu vhoda; v obdelavi je največ `max_inflight` paketov."""
+        inflight = deque()
+        for item in items:
+            inflight.append(submit(item))
+            if len(inflight) >= self.max_inflight:
+                yield inflight.popleft().result()
+        while inflight:
+            yield inflight.popleft().result()
+    
+    def _merge(self, result: Tuple[List, Dict[str, Any]]) -> List:
+        results, deltas = result
+        merge_counter_deltas(deltas['counters'])
+        if self.registry:
+            self.registry.summary_router().merge_stats(deltas['summary_tiers'])
+            if self.registry.cache and deltas['cache']:
+                self.registry.cache.merge_stats(**deltas['cache'])
+        return results
+    
+    def close(self):
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self) -> 'InferenceWorkerPool':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
@@ -32,9 +32,15 @@ class FinancialNewsWorkspace:
                 'src/visualization',
                 'src/interface',
                 'src/evaluation',
+                'src/storage',
+                'src/pipeline',
+                'src/models',
+                'src/monitoring',
                 'data/raw',
                 'data/processed',
                 'data/summaries',
+                'data/cache',
+                'data/timeseries',
                 'evaluation_results',
                 'tests',
                 'logs'